@@ -1,13 +1,100 @@
+import hashlib
+import os
+import secrets
+import sys
+import threading
+from collections import OrderedDict
+from typing import Optional
 from fastapi import Security, HTTPException, status
 from fastapi.security import APIKeyHeader
+from sqlalchemy.orm import Session
 
-API_KEY = "your-secret-api-key"  # In production, this should be in environment variables
+# The key the bundled frontend sends; set API_KEY to replace it, or empty to disable it
+API_KEY = os.getenv("API_KEY", "your-secret-api-key")
 api_key_header = APIKeyHeader(name="X-API-Key")
 
+def hash_api_key(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+class ApiKeyRegistry:
+    """
+    Named API keys held as SHA-256 digests, one per integration
+    A key is checked by looking its digest up in a dict: lookup timing can only leak
+    bits of the digest, never of the key. Keys that verified recently skip the hash
+    through a small LRU, which holds those keys in plaintext in process memory
+    """
+
+    def __init__(self, cache_size: int = 256):
+        self.cache_size = cache_size
+        self._digests = {}
+        self._verified = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, name: str, digest: str):
+        with self._lock:
+            self._digests[digest] = name
+            self._verified.clear()
+
+    def add_key(self, name: str, key: str):
+        self.add(name, hash_api_key(key))
+
+    def verify(self, key: str) -> Optional[str]:
+        """Name of the integration owning key, or None if it isn't registered"""
+        # Single dict operations are atomic, so the hot path takes no lock
+        name = self._verified.get(key)
+        if name is not None:
+            try:
+                self._verified.move_to_end(key)
+            except KeyError:
+                pass  # Evicted meanwhile by another thread
+            return name
+
+        name = self._digests.get(hash_api_key(key))
+        if name is None:
+            return None
+
+        # Only valid keys are cached, so bad guesses can't evict them
+        with self._lock:
+            self._verified[key] = name
+            while len(self._verified) > self.cache_size:
+                self._verified.popitem(last=False)
+        return name
+
+def load_env_keys(registry: ApiKeyRegistry):
+    """Register API_KEY and the comma separated name:key pairs in API_KEYS"""
+    if API_KEY:
+        registry.add_key("default", API_KEY)
+    for entry in os.getenv("API_KEYS", "").split(","):
+        name, separator, key = entry.strip().partition(":")
+        if separator and key:
+            registry.add_key(name, key)
+
+def load_db_keys(registry: ApiKeyRegistry, db: Session):
+    """Register the active keys stored in the api_keys table"""
+    from models import ApiKey
+    for name, key_hash in db.query(ApiKey.name, ApiKey.key_hash).filter(ApiKey.is_active.is_(True)):
+        registry.add(name, key_hash)
+
+api_keys = ApiKeyRegistry()
+load_env_keys(api_keys)
+
 async def get_api_key(api_key: str = Security(api_key_header)):
-    if api_key != API_KEY:
+    if api_keys.verify(api_key) is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API Key"
         )
-    return api_key
\ No newline at end of file
+    return api_key
+
+if __name__ == "__main__":
+    # python auth.py <integration name>: store a new key's digest and print the key once
+    from database import SessionLocal, Base, engine
+    from models import ApiKey
+    if len(sys.argv) != 2:
+        sys.exit("usage: python auth.py <integration name>")
+    Base.metadata.create_all(bind=engine)
+    key = secrets.token_urlsafe(32)
+    with SessionLocal() as db:
+        db.add(ApiKey(name=sys.argv[1], key_hash=hash_api_key(key)))
+        db.commit()
+    print(key)
\ No newline at end of file
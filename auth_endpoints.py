@@ -1,17 +1,23 @@
+import os
+import time
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select, event
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
-from database import get_db
+from database import get_db, get_async_db
 from user_models import User
-import secrets
+from passwords import password_hasher, needs_rehash, PasswordHasherBusy
+from sessions import session_store, SESSION_LIFETIME
+from starlette.concurrency import run_in_threadpool
+from cache import MemoryCache
+from metrics import Counter, Histogram
 import hashlib
-from datetime import datetime, timedelta
+from datetime import datetime
+from typing import Optional
 
 router = APIRouter()
 
-# Session storage (in production, use Redis or database)
-active_sessions = {}
-
 class UserCreate(BaseModel):
     username: str
     email: EmailStr
@@ -36,20 +42,68 @@ class LoginResponse(BaseModel):
     session_token: str
     message: str
 
-def create_session_token() -> str:
-    """Generate a secure session token"""
-    return secrets.token_urlsafe(32)
-
 def verify_session_token(token: str) -> dict:
-    """Verify and return session data"""
-    return active_sessions.get(token)
+    """Verify and return session data, None if it doesn't exist or expired"""
+    return session_store.get(token)
+
+# Active users by id for verify-session, which the frontend calls on every navigation.
+# Changes made through the ORM in this process invalidate the entry; changes made
+# elsewhere show up within USER_CACHE_TTL seconds (0 disables the cache)
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))
+user_cache = MemoryCache(int(os.getenv("USER_CACHE_SIZE", "1024")))
+user_cache_hits = Counter("user_cache_hits_total", "verify-session user lookups served from the user cache")
+user_cache_misses = Counter("user_cache_misses_total", "verify-session user lookups that queried the database")
+verify_session_seconds = Histogram("verify_session_seconds", "Time to verify a session and load its user")
+
+def load_active_user(user_id: int, db: Session) -> Optional[UserResponse]:
+    """The user if it exists and is active, from the user cache when possible"""
+    key = f"user:{user_id}"
+    cached = user_cache.get(key)
+    if cached is not None:
+        user_cache_hits.inc()
+        return UserResponse.model_validate_json(cached)
+    
+    user_cache_misses.inc()
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user or not user.is_active:
+        return None
+    user_response = UserResponse.model_validate(user)
+    if USER_CACHE_TTL > 0:
+        user_cache.set(key, user_response.model_dump_json().encode(), ex=USER_CACHE_TTL)
+    return user_response
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_cached_user(mapper, connection, user: User):
+    # Dropped at flush and again after commit: a verify in between still reads the
+    # old row and could cache it
+    user_cache.delete(f"user:{user.id}")
+    session = object_session(user)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(user.id)
+
+@event.listens_for(Session, "after_commit")
+def invalidate_committed_users(session: Session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        user_cache.delete(f"user:{user_id}")
+
+@event.listens_for(Session, "after_rollback")
+def forget_changed_users(session: Session):
+    session.info.pop("changed_user_ids", None)
+
+def hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many logins in progress, try again shortly",
+        headers={"Retry-After": "1"}
+    )
 
 @router.post("/register", response_model=UserResponse)
-def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     
     # Check if username already exists
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
+    existing_user = await db.scalar(select(User).where(User.username == user_data.username))
     if existing_user:
         raise HTTPException(
             status_code=400,
@@ -57,15 +111,20 @@ def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Check if email already exists
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
+    existing_email = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_email:
         raise HTTPException(
             status_code=400,
             detail="Email already registered"
         )
     
-    # Create new user
-    hashed_password = User.hash_password(user_data.password)
+    # Create new user, hashing on the password hasher's threads. Ending the read
+    # transaction first returns the connection to the pool while the hash runs
+    await db.commit()
+    try:
+        hashed_password = await password_hasher.hash(user_data.password)
+    except PasswordHasherBusy:
+        raise hashing_busy()
     db_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -73,30 +132,43 @@ def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
 @router.post("/login", response_model=LoginResponse)
-def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login_user(user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login user and create session"""
     
     # Find user by username
-    user = db.query(User).filter(User.username == user_data.username).first()
+    user = await db.scalar(select(User).where(User.username == user_data.username))
     if not user:
         raise HTTPException(
             status_code=401,
             detail="Invalid username or password"
         )
     
-    # Verify password
-    if not User.verify_password(user_data.password, user.hashed_password):
+    # Verify password, with the connection back in the pool meanwhile
+    await db.commit()
+    try:
+        password_valid = await password_hasher.verify(user_data.password, user.hashed_password)
+    except PasswordHasherBusy:
+        raise hashing_busy()
+    if not password_valid:
         raise HTTPException(
             status_code=401,
             detail="Invalid username or password"
         )
     
+    # Upgrade old hashes and iteration counts while we have the password
+    if needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = await password_hasher.hash(user_data.password)
+            await db.commit()
+        except PasswordHasherBusy:
+            pass  # Try again on a later login
+    
     # Check if user is active
     if not user.is_active:
         raise HTTPException(
@@ -105,13 +177,11 @@ def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
         )
     
     # Create session
-    session_token = create_session_token()
-    active_sessions[session_token] = {
+    session_token = await run_in_threadpool(session_store.create, {
         "user_id": user.id,
         "username": user.username,
-        "created_at": datetime.utcnow(),
-        "expires_at": datetime.utcnow() + timedelta(days=7)  # 7 day session
-    }
+        "created_at": datetime.utcnow().isoformat()
+    }, datetime.utcnow() + SESSION_LIFETIME)
     
     return LoginResponse(
         user=user,
@@ -122,8 +192,7 @@ def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
 @router.post("/logout")
 def logout_user(session_token: str):
     """Logout user and invalidate session"""
-    if session_token in active_sessions:
-        del active_sessions[session_token]
+    if session_store.delete(session_token):
         return {"message": "Logout successful"}
     else:
         raise HTTPException(
@@ -134,33 +203,29 @@ def logout_user(session_token: str):
 @router.get("/verify-session")
 def verify_session(session_token: str, db: Session = Depends(get_db)):
     """Verify if session is valid and return user info"""
-    session_data = verify_session_token(session_token)
-    
-    if not session_data:
-        raise HTTPException(
-            status_code=401,
-            detail="Invalid or expired session"
-        )
-    
-    # Check if session is expired
-    if datetime.utcnow() > session_data["expires_at"]:
-        del active_sessions[session_token]
-        raise HTTPException(
-            status_code=401,
-            detail="Session expired"
-        )
-    
-    # Get current user data
-    user = db.query(User).filter(User.id == session_data["user_id"]).first()
-    if not user or not user.is_active:
-        del active_sessions[session_token]
-        raise HTTPException(
-            status_code=401,
-            detail="User account not found or disabled"
-        )
-    
-    return {
-        "user": user,
-        "session_valid": True,
-        "expires_at": session_data["expires_at"]
-    }
\ No newline at end of file
+    started = time.perf_counter()
+    try:
+        session_data = verify_session_token(session_token)
+        
+        if not session_data:
+            raise HTTPException(
+                status_code=401,
+                detail="Invalid or expired session"
+            )
+        
+        # Get current user data
+        user = load_active_user(session_data["user_id"], db)
+        if not user:
+            session_store.delete(session_token)
+            raise HTTPException(
+                status_code=401,
+                detail="User account not found or disabled"
+            )
+        
+        return {
+            "user": user,
+            "session_valid": True,
+            "expires_at": session_data["expires_at"]
+        }
+    finally:
+        verify_session_seconds.observe(time.perf_counter() - started)
\ No newline at end of file
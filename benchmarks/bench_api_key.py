@@ -0,0 +1,64 @@
+"""
+Per-request cost of the get_api_key dependency: the key registry with a warm LRU, with
+every call hashing the key, and rejecting a bad key, against the single hardcoded key
+compare it replaced.
+
+Run from the repository root (the registry size defaults to 1,000 keys):
+    python benchmarks/bench_api_key.py [keys]
+"""
+import asyncio
+import os
+import secrets
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fastapi import HTTPException
+import auth
+
+CALLS = 200_000
+
+async def no_check(api_key: str):
+    return api_key
+
+async def single_key(api_key: str):
+    # get_api_key before the registry
+    if api_key != auth.API_KEY:
+        raise HTTPException(status_code=401, detail="Invalid API Key")
+    return api_key
+
+async def per_call(dependency, key: str) -> float:
+    started = time.perf_counter()
+    for _ in range(CALLS):
+        try:
+            await dependency(key)
+        except HTTPException:
+            pass
+    return (time.perf_counter() - started) / CALLS
+
+def registry(integration_keys: list, cache_size: int) -> auth.ApiKeyRegistry:
+    registry = auth.ApiKeyRegistry(cache_size)
+    for number, key in enumerate(integration_keys):
+        registry.add_key(f"integration {number}", key)
+    return registry
+
+async def main(keys: int):
+    integration_keys = [secrets.token_urlsafe(32) for _ in range(keys)]
+    key = integration_keys[keys // 2]
+    auth.api_keys = registry(integration_keys, cache_size=256)  # get_api_key reads it per call
+
+    empty = await per_call(no_check, key)
+    results = [("single hardcoded key", await per_call(single_key, auth.API_KEY))]
+    results.append(("registry, LRU hit", await per_call(auth.get_api_key, key)))
+    auth.api_keys = registry(integration_keys, cache_size=0)
+    results.append(("registry, hashing every call", await per_call(auth.get_api_key, key)))
+    results.append(("registry, invalid key", await per_call(auth.get_api_key, secrets.token_urlsafe(32))))
+
+    print(f"{keys} registered keys, {CALLS} calls each, net of awaiting a no-op dependency ({empty * 1e9:.0f} ns)")
+    for name, seconds in results:
+        print(f"  {name:30} {(seconds - empty) * 1e9:8.0f} ns/request")
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+Load test the async endpoints against the sync stack they replaced: requests/sec and
+latency percentiles for a mixed read/write workload on one uvicorn worker.
+
+The sync stack is the tree at sync-ref, by default the last commit before
+database.py gained get_async_db. Needs httpx for the load generator.
+
+Run from the repository root:
+    python benchmarks/bench_async_stack.py [sync-ref] [concurrency] [seconds]
+"""
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+from harness import HEADERS, checkout, ref_before, seed, wait_until_up
+
+VENUES = 200
+EVENTS_PER_VENUE = 25
+
+def next_request(rng: random.Random, counter: list):
+    """One request of the mix: mostly reads, with a steady trickle of writes"""
+    roll = rng.random()
+    if roll < 0.3:
+        return "GET", "/venues/", {"params": {"limit": 50, "after_id": rng.randint(0, VENUES - 50)}}
+    if roll < 0.5:
+        return "GET", f"/venues/{rng.randint(1, VENUES)}", {}
+    if roll < 0.7:
+        return "GET", f"/events/{rng.randint(1, VENUES * EVENTS_PER_VENUE)}", {}
+    if roll < 0.8:
+        return "GET", f"/venues/{rng.randint(1, VENUES)}/events/", {"params": {"limit": 20}}
+    if roll < 0.9:
+        return "GET", "/search", {"params": {"q": f"Venue {rng.randint(1, VENUES)}", "limit": 10}}
+    counter[0] += 1
+    return "POST", "/events/", {"json": {
+        "venue_id": rng.randint(1, VENUES), "name": f"Load {counter[0]}",
+        "url": f"https://load.example.com/events/{os.getpid()}-{counter[0]}"
+    }}
+
+async def load(client: httpx.AsyncClient, concurrency: int, seconds: float):
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    counter = [0]
+
+    async def user(seed_value: int):
+        nonlocal errors
+        rng = random.Random(seed_value)
+        while time.perf_counter() < deadline:
+            method, path, kwargs = next_request(rng, counter)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, headers=HEADERS, timeout=60, **kwargs)
+            except httpx.TransportError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 500:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    percentile = lambda p: latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000
+    print(f"  {len(latencies) / elapsed:8.0f} req/s   p50 {percentile(0.5):7.1f} ms   "
+          f"p99 {percentile(0.99):7.1f} ms   errors: {errors}")
+
+async def bench(directory: str, concurrency: int, seconds: float, port: int):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning",
+         "--timeout-keep-alive", "60"],
+        cwd=directory
+    )
+    try:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        base_url = f"http://127.0.0.1:{port}"
+        wait_until_up(base_url)
+        seed(base_url, VENUES, EVENTS_PER_VENUE)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+            await load(client, concurrency, seconds)
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    sync_ref = sys.argv[1] if len(sys.argv) > 1 else ref_before("get_async_db", "database.py")
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 15
+    print(f"{concurrency} concurrent clients for {seconds:.0f}s, {VENUES} venues x {EVENTS_PER_VENUE} events")
+    for name, ref, port in (("sync stack", sync_ref, 8731), ("async stack", None, 8732)):
+        print(f"{name} ({ref or 'working tree'})")
+        asyncio.run(bench(checkout(ref), concurrency, seconds, port))
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Resolve lists of known ids through POST /events/batch-get and /venues/batch-get against
+a loop of single GETs, the way the dashboard did: ids resolved per second on one
+uvicorn worker, with the response cache off so every single GET reaches the database.
+
+Run from the repository root:
+    python benchmarks/bench_batch_get.py [ids-per-list] [seconds]
+"""
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from harness import HEADERS, ROOT, seed, wait_until_up
+
+VENUES = 1000
+EVENTS_PER_VENUE = 50
+PORT = 8733
+
+def single_gets(client: httpx.Client, path: str, ids: list):
+    return [client.get(f"{path}{id}", headers=HEADERS).status_code == 200 for id in ids]
+
+def batch_get(client: httpx.Client, path: str, ids: list):
+    items = client.post(f"{path}batch-get", json={"ids": ids}, headers=HEADERS).json()
+    return [item["found"] for item in items]
+
+def run(client: httpx.Client, path: str, resolve, count: int, highest: int, seconds: float) -> float:
+    rng = random.Random(0)
+    resolved = 0
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        # A few ids past the end exercise the not-found path
+        ids = [rng.randint(1, highest + highest // 20) for _ in range(count)]
+        resolve(client, path, ids)
+        resolved += len(ids)
+    return resolved / (time.perf_counter() - started)
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning",
+         "--app-dir", ROOT],
+        cwd=tempfile.mkdtemp(),  # keep the benchmark database out of the repo
+        env={**os.environ, "RESPONSE_CACHE_SIZE": "0"}
+    )
+    try:
+        base_url = f"http://127.0.0.1:{PORT}"
+        wait_until_up(base_url)
+        seed(base_url, VENUES, EVENTS_PER_VENUE)
+        with httpx.Client(base_url=base_url, timeout=60) as client:
+            print(f"Lists of {count} ids, {VENUES} venues x {EVENTS_PER_VENUE} events, {seconds:.0f}s each")
+            for path, highest in (("/events/", VENUES * EVENTS_PER_VENUE), ("/venues/", VENUES)):
+                loop = run(client, path, single_gets, count, highest, seconds)
+                batch = run(client, path, batch_get, count, highest, seconds)
+                print(f"{path}")
+                print(f"  single GET loop: {loop:10.0f} ids/s")
+                print(f"  batch-get:       {batch:10.0f} ids/s   ({batch / loop:.0f}x)")
+    finally:
+        server.terminate()
+        server.wait()
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""
+Benchmark POST /events/bulk throughput (rows/sec) at increasing paste sizes.
+
+Run from the repository root:
+    python benchmarks/bench_bulk_events.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp())  # keep the benchmark database out of the repo
+
+from database import AsyncSessionLocal
+from models import Venue
+from main import create_bulk_events, BulkEventCreate
+
+SIZES = [100, 1_000, 10_000, 100_000]
+
+async def run(size: int) -> float:
+    async with AsyncSessionLocal() as db:
+        venue = Venue(name=f"Bench Venue {size}", description="")
+        db.add(venue)
+        await db.commit()
+        lines = [f"https://bench.example.com/events/{size}-{i}" for i in range(size)]
+        # Every tenth line repeats, so in-payload dedupe is exercised as well
+        lines += lines[::10]
+        payload = BulkEventCreate(venue_id=venue.id, bulk_input="\n".join(lines))
+        start = time.perf_counter()
+        created = await create_bulk_events(payload, db)
+        elapsed = time.perf_counter() - start
+        assert len(created) == size
+        return elapsed
+
+async def main():
+    print(f"{'lines':>8} {'seconds':>9} {'rows/sec':>10}")
+    for size in SIZES:
+        elapsed = await run(size)
+        print(f"{size:>8} {elapsed:>9.3f} {size / elapsed:>10.0f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""
+Compare GET /events/ rendered through EventResponse validation and the stdlib encoder
+against the FAST_JSON path (plain column rows, orjson when installed): latency and
+peak allocations for one full-list request, with identical response bodies.
+
+Run from the repository root (the event count defaults to 100,000):
+    python benchmarks/bench_json_responses.py [events]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp())  # keep the benchmark database out of the repo
+os.environ["RESPONSE_CACHE_SIZE"] = "0"  # measure rendering, not cache hits
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+import main
+from database import engine
+from models import Venue, Event
+
+HEADERS = {"X-API-Key": "your-secret-api-key"}
+RUNS = 5
+
+def populate(events: int):
+    with engine.begin() as conn:
+        conn.execute(insert(Venue), [{"name": f"Venue {i}", "description": "Bench venue"} for i in range(100)])
+        for start in range(0, events, 10_000):
+            conn.execute(insert(Event), [
+                {"name": f"Event {i}", "url": f"https://bench.example.com/events/{i}",
+                 "event_id": str(i), "date": "2024-06-01", "venue_id": i % 100 + 1}
+                for i in range(start, min(start + 10_000, events))
+            ])
+
+def measure(client: TestClient, fast: bool):
+    main.FAST_JSON = fast
+    body = client.get("/events/", headers=HEADERS).content  # warm up
+
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        client.get("/events/", headers=HEADERS)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    client.get("/events/", headers=HEADERS)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return body, statistics.median(timings), peak
+
+if __name__ == "__main__":
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    populate(events)
+    client = TestClient(main.app)
+
+    print(f"GET /events/ with {events} events, median of {RUNS} requests")
+    print(f"orjson {'installed' if main.orjson is not None else 'not installed, using the stdlib encoder'}")
+    slow_body, slow_time, slow_peak = measure(client, fast=False)
+    fast_body, fast_time, fast_peak = measure(client, fast=True)
+    assert fast_body == slow_body, "fast path changed the response body"
+
+    print(f"  response models: {slow_time * 1000:8.1f} ms   peak {slow_peak / 1e6:7.1f} MB")
+    print(f"  FAST_JSON:       {fast_time * 1000:8.1f} ms   peak {fast_peak / 1e6:7.1f} MB")
+    print(f"  {slow_time / fast_time:.1f}x faster, identical {len(fast_body)} byte body")
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""
+Login throughput while read traffic runs, with PBKDF2 on the request threadpool (the
+tree at sync-ref, by default the last commit before auth_endpoints.py used the
+password hasher) against the bounded password hasher in the working tree. Serves
+main.py with the auth_endpoints router mounted at /users on one uvicorn worker.
+Needs httpx for the load generator.
+
+Run from the repository root:
+    python benchmarks/bench_password_hashing.py [sync-ref] [login-clients] [read-clients] [seconds]
+"""
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+if __name__ != "__main__":
+    # Imported by uvicorn from a checkout: the app under test
+    import auth_endpoints
+    import main
+    from database import Base, engine
+    Base.metadata.create_all(bind=engine)
+    main.app.include_router(auth_endpoints.router, prefix="/users")
+    app = main.app
+else:
+    import httpx
+    from harness import HEADERS, checkout, ref_before, seed, wait_until_up
+
+USERS = 20
+VENUES = 200
+
+async def register_users(client: "httpx.AsyncClient"):
+    for i in range(USERS):
+        await client.post("/users/register", timeout=60, json={
+            "username": f"user{i}", "email": f"user{i}@example.com", "password": f"password {i}"
+        })
+
+async def clients(count: int, deadline: float, request):
+    """Run count clients sending request(rng) until the deadline; (latencies, statuses)"""
+    latencies = []
+    statuses = {}
+
+    async def client(seed_value: int):
+        rng = random.Random(seed_value)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await request(rng)
+            except httpx.TransportError:
+                statuses["error"] = statuses.get("error", 0) + 1
+                continue
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - started)
+            elif response.status_code == 503:
+                await asyncio.sleep(0.05)  # Back off as Retry-After asks
+
+    await asyncio.gather(*(client(i) for i in range(count)))
+    return latencies, statuses
+
+def report(name: str, latencies: list, statuses: dict, elapsed: float):
+    latencies.sort()
+    percentile = lambda p: latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000 if latencies else float("nan")
+    print(f"  {name:6} {len(latencies) / elapsed:7.0f} ok/s   p50 {percentile(0.5):7.1f} ms   "
+          f"p99 {percentile(0.99):7.1f} ms   statuses: {dict(sorted(statuses.items(), key=str))}")
+
+async def bench(directory: str, login_clients: int, read_clients: int, seconds: float, port: int):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "bench_password_hashing:app", "--port", str(port),
+         "--log-level", "warning", "--timeout-keep-alive", "60"],
+        cwd=directory, env={**os.environ, "RESPONSE_CACHE_SIZE": "0"}
+    )
+    try:
+        limits = httpx.Limits(max_connections=login_clients + read_clients)
+        base_url = f"http://127.0.0.1:{port}"
+        wait_until_up(base_url)
+        seed(base_url, VENUES)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+            await register_users(client)
+
+            def login(rng):
+                user = rng.randrange(USERS)
+                return client.post("/users/login", json={"username": f"user{user}", "password": f"password {user}"})
+
+            def read(rng):
+                if rng.random() < 0.5:
+                    return client.get(f"/venues/{rng.randint(1, VENUES)}", headers=HEADERS)
+                return client.get("/search/suggest", params={"q": f"venue {rng.randint(1, VENUES)}"}, headers=HEADERS)
+
+            started = time.perf_counter()
+            deadline = started + seconds
+            (login_latencies, login_statuses), (read_latencies, read_statuses) = await asyncio.gather(
+                clients(login_clients, deadline, login), clients(read_clients, deadline, read)
+            )
+            elapsed = time.perf_counter() - started
+            report("logins", login_latencies, login_statuses, elapsed)
+            report("reads", read_latencies, read_statuses, elapsed)
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    sync_ref = sys.argv[1] if len(sys.argv) > 1 else ref_before("password_hasher", "auth_endpoints.py")
+    login_clients = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    read_clients = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    seconds = float(sys.argv[4]) if len(sys.argv) > 4 else 15
+    print(f"{login_clients} login clients and {read_clients} read clients for {seconds:.0f}s")
+    for name, ref, port in (("hashing on the request threadpool", sync_ref, 8734),
+                            ("bounded password hasher", None, 8735)):
+        print(f"{name} ({ref or 'working tree'})")
+        asyncio.run(bench(checkout(ref, __file__), login_clients, read_clients, seconds, port))
\ No newline at end of file
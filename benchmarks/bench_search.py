@@ -0,0 +1,76 @@
+"""
+Compare /search through the FTS5 index against the previous leading-wildcard ILIKE.
+
+Run from the repository root (the event count defaults to 1,000,000):
+    python benchmarks/bench_search.py [events]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp())  # keep the benchmark database out of the repo
+
+from sqlalchemy import insert
+from database import engine, SessionLocal, Base
+from models import Venue, Event
+import search
+
+WORDS = ["knicks", "rangers", "concert", "comedy", "jazz", "festival", "symphony", "rock",
+         "indie", "electronic", "theater", "dance", "spring", "fall", "night", "tour"]
+QUERIES = ["knicks", "jazz fest", "sym", "night tour", "zzz"]
+
+def populate(events: int):
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(0)
+    with engine.begin() as conn:
+        conn.execute(insert(Venue), [{"name": f"Venue {i} {rng.choice(WORDS)}", "description": ""} for i in range(1000)])
+        batch = []
+        for i in range(events):
+            batch.append({
+                "name": f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}",
+                "url": f"https://bench.example.com/events/{i}",
+                "event_id": f"{rng.choice(WORDS)}-{i}",
+                "venue_id": rng.randint(1, 1000)
+            })
+            if len(batch) == 10_000:
+                conn.execute(insert(Event), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Event), batch)
+
+def ilike_search(db, q):
+    venues = db.query(Venue).filter(Venue.name.ilike(f"%{q}%")).all()
+    events = db.query(Event).filter(Event.event_id.ilike(f"%{q}%") | Event.name.ilike(f"%{q}%")).all()
+    return venues, events
+
+def fts_search(db, q):
+    return search.search_venues(q, 50, 0, db), search.search_events(q, 50, 0, db)
+
+def timed(func, db, q, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        venues, events = func(db, q)
+        best = min(best, time.perf_counter() - start)
+    return best, len(venues) + len(events)
+
+if __name__ == "__main__":
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    start = time.perf_counter()
+    populate(events)
+    print(f"inserted {events} events in {time.perf_counter() - start:.1f}s")
+    start = time.perf_counter()
+    search.setup_search(engine)
+    print(f"built {search.search_backend} index in {time.perf_counter() - start:.1f}s\n")
+
+    db = SessionLocal()
+    print(f"{'query':>12} {'ilike ms':>10} {'rows':>8} {'fts ms':>8} {'rows':>6} {'speedup':>8}")
+    for q in QUERIES:
+        ilike, ilike_rows = timed(ilike_search, db, q)
+        fts, fts_rows = timed(fts_search, db, q)
+        print(f"{q:>12} {ilike * 1000:>10.1f} {ilike_rows:>8} {fts * 1000:>8.1f} {fts_rows:>6} {ilike / fts:>7.0f}x")
+    db.close()
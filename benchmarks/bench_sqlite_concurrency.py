@@ -0,0 +1,115 @@
+"""
+Read throughput on /venues/-style list queries while a bulk event import is writing,
+with the WAL pragma profile from database.py against SQLite's rollback-journal defaults.
+
+Run from the repository root:
+    python benchmarks/bench_sqlite_concurrency.py [events] [readers]
+"""
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    # SQLite defaults as used before the pragma profile, keeping the driver's 5s lock timeout
+    "rollback journal": {
+        "SQLITE_JOURNAL_MODE": "DELETE", "SQLITE_SYNCHRONOUS": "FULL", "SQLITE_MMAP_SIZE": "",
+        "SQLITE_CACHE_SIZE": "", "SQLITE_TEMP_STORE": "", "SQLITE_BUSY_TIMEOUT": "",
+    },
+    "wal profile": {},
+}
+
+CHUNK_SIZE = 500  # Matches BULK_CHUNK_SIZE: one commit per chunk, as /events/import does
+
+def run_profile(events: int, readers: int):
+    sys.path.insert(0, ROOT)
+    os.chdir(tempfile.mkdtemp())  # keep the benchmark database out of the repo
+
+    from sqlalchemy import insert
+    from sqlalchemy.exc import OperationalError
+    from database import engine, SessionLocal, Base
+    from models import Venue, Event
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Venue), [{"name": f"Venue {i}", "description": ""} for i in range(1000)])
+
+    # Readers run in their own processes, like separate uvicorn workers
+    writing = multiprocessing.Event()
+    writing.set()
+    results = multiprocessing.Queue()
+
+    def reader():
+        engine.dispose(close=False)  # Don't share the parent's pooled connections
+        latencies = []
+        errors = 0
+        with SessionLocal() as db:
+            after_id = 0
+            while writing.is_set():
+                started = time.perf_counter()
+                try:
+                    rows = (
+                        db.query(Venue).filter(Venue.id > after_id)
+                        .order_by(Venue.id).limit(100).all()
+                    )
+                    db.commit()  # End the read transaction like a request would
+                except OperationalError:
+                    db.rollback()
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+                after_id = rows[-1].id if len(rows) == 100 else 0
+        results.put((latencies, errors))
+
+    engine.dispose()
+    processes = [multiprocessing.Process(target=reader) for _ in range(readers)]
+    for process in processes:
+        process.start()
+    time.sleep(0.5)  # Let the readers connect before the import starts
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        for offset in range(0, events, CHUNK_SIZE):
+            db.execute(insert(Event), [
+                {"name": f"Event {i}", "url": f"https://bench.example.com/events/{i}",
+                 "event_id": str(i), "venue_id": i % 1000 + 1}
+                for i in range(offset, min(offset + CHUNK_SIZE, events))
+            ])
+            db.commit()
+    elapsed = time.perf_counter() - started
+    writing.clear()
+
+    latencies = []
+    errors = 0
+    for _ in processes:
+        reader_latencies, reader_errors = results.get()
+        latencies.extend(reader_latencies)
+        errors += reader_errors
+    for process in processes:
+        process.join()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float("nan")
+    print(f"  import: {events / elapsed:10.0f} events/s   "
+          f"reads: {len(latencies) / elapsed:8.0f}/s   p99 read: {p99:7.2f} ms   "
+          f"locked errors: {errors}")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--profile":
+        run_profile(int(sys.argv[2]), int(sys.argv[3]))
+        sys.exit()
+
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    print(f"{events} events imported in chunks of {CHUNK_SIZE}, {readers} concurrent readers")
+    for name, overrides in PROFILES.items():
+        print(name)
+        # Pragmas are read when database.py is imported, so each profile gets its own process
+        subprocess.run(
+            [sys.executable, __file__, "--profile", str(events), str(readers)],
+            env={**os.environ, **overrides}, check=True
+        )
\ No newline at end of file
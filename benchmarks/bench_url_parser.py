@@ -0,0 +1,115 @@
+"""
+Micro-benchmarks for url_parser on synthetic event URLs.
+
+Run from the repository root:
+    python benchmarks/bench_url_parser.py
+"""
+import os
+import re
+import sys
+import time
+from urllib.parse import urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from url_parser import detect_base_url_pattern, extract_event_ids, _common_path_prefix
+
+SIZES = [1_000, 100_000]
+
+def legacy_detect_base_url_pattern(urls):
+    """Character-trimming prefix loop detect_base_url_pattern used before"""
+    if len(urls) < 2:
+        return None
+    parsed_urls = [urlparse(url) for url in urls]
+    domains = set(parsed.netloc for parsed in parsed_urls)
+    if len(domains) != 1:
+        return None
+    domain = domains.pop()
+    common_prefix = legacy_common_prefix([parsed.path for parsed in parsed_urls])
+    while common_prefix and common_prefix[-1] in '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ-_':
+        common_prefix = common_prefix[:-1]
+    base_url = f"https://{domain}{common_prefix}"
+    if base_url.endswith('/'):
+        base_url = base_url[:-1]
+    return base_url
+
+def legacy_extract_event_id_from_url(url):
+    """Seven sequential re.search calls extract_event_id_from_url used before"""
+    patterns = [
+        r'/events?/([a-zA-Z0-9\-_]+)',
+        r'/event-([a-zA-Z0-9\-_]+)',
+        r'/e/([a-zA-Z0-9\-_]+)',
+        r'/tickets/([a-zA-Z0-9\-_]+)',
+        r'/ticket/([a-zA-Z0-9\-_]+)',
+        r'/show/([a-zA-Z0-9\-_]+)',
+        r'/([a-zA-Z0-9\-_]+)/?$',
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, url)
+        if match:
+            return match.group(1)
+    return None
+
+def legacy_extract_event_ids(urls):
+    return [legacy_extract_event_id_from_url(url) for url in urls]
+
+def legacy_common_prefix(paths):
+    common_prefix = paths[0]
+    for path in paths[1:]:
+        while common_prefix and not path.startswith(common_prefix):
+            common_prefix = common_prefix[:-1]
+    return common_prefix
+
+def synthetic_urls(size: int):
+    # Long shared path with a long per-event tail, the slow case for trimming
+    return [
+        f"https://tickets.example.com/venues/main-hall/events/2024/{'x' * 200}-{i:08d}"
+        for i in range(size)
+    ]
+
+def mixed_urls(size: int):
+    # One URL shape per extraction rule, including the end-of-URL fallback
+    shapes = [
+        "https://barclayscenter.com/events/nets-warriors-{}",
+        "https://msg.com/knicks/tickets/{}",
+        "https://venue.example.com/show/{}/details",
+        "https://radiocity.com/christmas-spectacular-{}",
+        "https://websterhall.com/indie-rock-show-{}/",
+    ]
+    return [shapes[i % len(shapes)].format(i) for i in range(size)]
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def report(name, legacy_func, current_func, make_args, check=True):
+    print(name)
+    print(f"{'urls':>8} {'legacy s':>10} {'current s':>10} {'speedup':>8}")
+    for size in SIZES:
+        args = make_args(size)
+        expected, legacy = timed(legacy_func, *args)
+        result, current = timed(current_func, *args)
+        if check:
+            assert result == expected
+        print(f"{size:>8} {legacy:>10.3f} {current:>10.3f} {legacy / current:>7.1f}x")
+    print()
+
+def bench_detect_base_url_pattern():
+    report("detect_base_url_pattern (end to end, dominated by urlparse)",
+           legacy_detect_base_url_pattern, detect_base_url_pattern,
+           lambda size: (synthetic_urls(size),))
+    # The legacy result may end mid-segment, the current one never does
+    report("common path prefix step",
+           legacy_common_prefix, _common_path_prefix,
+           lambda size: ([urlparse(url).path for url in synthetic_urls(size)],), check=False)
+
+def bench_extract_event_ids():
+    report("extract_event_ids",
+           legacy_extract_event_ids, extract_event_ids,
+           lambda size: (mixed_urls(size),))
+
+if __name__ == "__main__":
+    bench_detect_base_url_pattern()
+    bench_extract_event_ids()
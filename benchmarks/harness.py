@@ -0,0 +1,57 @@
+"""
+Helpers shared by the benchmarks that serve the app on uvicorn and load it over HTTP:
+checking out the tree to compare against, waiting for the server and seeding it.
+Needs httpx.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEADERS = {"X-API-Key": "your-secret-api-key"}
+
+def ref_before(term: str, path: str) -> str:
+    """The commit before term first appeared in path, or HEAD if it never did"""
+    first = subprocess.run(
+        ["git", "log", "--reverse", "--format=%H", "-S", term, "--", path],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.split()
+    return f"{first[0]}^" if first else "HEAD"
+
+def checkout(ref: str, *extra_files: str) -> str:
+    """Extract the tree at ref, or the working tree for ref=None, plus extra_files into a temp dir"""
+    directory = tempfile.mkdtemp()
+    if ref is None:
+        for name in os.listdir(ROOT):
+            if name.endswith(".py"):
+                shutil.copy(os.path.join(ROOT, name), directory)
+    else:
+        archive = subprocess.run(["git", "archive", ref, "*.py"], cwd=ROOT,
+                                 capture_output=True, check=True).stdout
+        subprocess.run(["tar", "-x"], cwd=directory, input=archive, check=True)
+    for path in extra_files:
+        shutil.copy(os.path.abspath(path), directory)
+    return directory
+
+def wait_until_up(base_url: str):
+    for _ in range(100):
+        try:
+            httpx.get(f"{base_url}/venues/", params={"limit": 1}, headers=HEADERS)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+def seed(base_url: str, venues: int, events_per_venue: int = 0):
+    """Create venues named "Venue <n>" through the bulk endpoints, each with events_per_venue events"""
+    with httpx.Client(base_url=base_url, headers=HEADERS, timeout=60) as client:
+        client.post("/venues/bulk", json={"bulk_input": "\n".join(f"Venue {i} | Bench venue" for i in range(venues))})
+        if not events_per_venue:
+            return
+        for venue_id in range(1, venues + 1):
+            urls = "\n".join(f"https://bench.example.com/events/{venue_id}-{i}" for i in range(events_per_venue))
+            client.post("/events/bulk", json={"venue_id": venue_id, "bulk_input": urls})
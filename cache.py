@@ -0,0 +1,224 @@
+import hashlib
+import json
+import math
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from email.utils import formatdate, mktime_tz, parsedate_tz
+from typing import Iterable, List, Optional, Tuple
+from metrics import Counter
+
+# Read-through cache for rendered GET responses.
+# Entries record the version of every scope they were built from ("venues" for the
+# venue list, "venue:<id>" for one venue and its events). Write handlers bump the
+# versions they touch after committing, which makes exactly the affected entries
+# stale; unrelated venues keep their cached responses. The same versions give every
+# cached route a strong ETag and a Last-Modified date for conditional GETs.
+# Versions are never reused, so they can expire: a scope nobody wrote to for a
+# while simply starts again at a fresh version, costing one miss.
+
+class CacheBackend(ABC):
+    """
+    Storage behind ResponseCache, deliberately a subset of Redis commands (GET, SET
+    with EX and NX, DEL, INCR) so a Redis client, or a local stand-in, can be dropped in.
+    Counters set by incr() must never be evicted: a counter that restarts from zero
+    could match the version recorded in an old entry. Set shared when every worker
+    process talks to the same store.
+    """
+
+    shared = False
+
+    @abstractmethod
+    def get(self, key: str):
+        """The value stored at key, or None if it is unset or expired"""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ex: Optional[float] = None, nx: bool = False) -> bool:
+        """Store value, expiring after ex seconds if given; with nx only if key is unset"""
+
+    @abstractmethod
+    def delete(self, *keys: str):
+        """Remove keys, whether values or counters"""
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        """Add one to the counter at key, starting from zero, and return the new count"""
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU of at most max_entries values, each expiring after its ttl, and
+    with max_bytes given, of at most that many bytes in total; a larger value is
+    not stored. Counters and values set without an expiry are kept outside the LRU.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._persistent = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            return self._get(key)
+
+    def _get(self, key: str):
+        if key in self._persistent:
+            return self._persistent[key]
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes, ex: Optional[float] = None, nx: bool = False) -> bool:
+        if not ex:
+            with self._lock:
+                if nx and self._get(key) is not None:
+                    return False
+                self._persistent[key] = value
+            return True
+        if self.max_entries <= 0:
+            return False
+        too_large = self.max_bytes is not None and len(value) > self.max_bytes
+        expires_at = time.monotonic() + ex
+        with self._lock:
+            if nx and self._get(key) is not None:
+                return False
+            self._discard(key)
+            if too_large:
+                return False
+            self._entries[key] = (expires_at, value)
+            self._bytes += len(value)
+            while len(self._entries) > self.max_entries or (
+                    self.max_bytes is not None and self._bytes > self.max_bytes):
+                self._discard(next(iter(self._entries)))
+        return True
+
+    def _discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._discard(key)
+                self._persistent.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._persistent[key] = int(self._persistent.get(key, 0)) + 1
+            return self._persistent[key]
+
+class ResponseCache:
+    """
+    JSON response bodies and headers cached per route and query, validated by scope versions
+    Versions are kept in version_store for version_ttl seconds after their last bump,
+    which should be well above ttl; by default that is backend when it is shared, and
+    otherwise a bounded in-process store of its own, so versions outlive the responses
+    and work even with response caching turned off
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = 60.0, prefix: str = "response:",
+                 version_store: Optional[CacheBackend] = None, version_ttl: float = 3600.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.prefix = prefix
+        if version_store is None:
+            version_store = backend if backend.shared else MemoryCache(100_000)
+        self.version_store = version_store
+        self.version_ttl = version_ttl
+        # Tags from another process, or from before a restart, never match ours
+        self.epoch = secrets.token_hex(8)
+        self.started_at = time.time()
+        self.hits = Counter("response_cache_hits_total", "GET responses served from the response cache")
+        self.misses = Counter("response_cache_misses_total", "GET responses rendered and stored in the response cache")
+
+    def key(self, path: str, params: Iterable[Tuple[str, str]]) -> str:
+        query = "&".join(f"{name}={value}" for name, value in sorted(params))
+        return f"{self.prefix}{path}?{query}"
+
+    def versions(self, scopes: List[str]) -> List[str]:
+        """Current versions of scopes; read them before querying the data they cover"""
+        versions = []
+        for scope in scopes:
+            key = f"{self.prefix}version:{scope}"
+            version = self.version_store.get(key)
+            if version is None:
+                # Never written, expired or evicted: start the scope at a fresh version
+                version = self._new_version()
+                if not self.version_store.set(key, version, ex=self.version_ttl, nx=True):
+                    version = self.version_store.get(key) or version
+            versions.append(version.decode())
+        return versions
+
+    def _new_version(self) -> bytes:
+        """A version no scope has had before, as <generation>@<modification time>"""
+        generation = self.version_store.incr(f"{self.prefix}generation")
+        return f"{generation}@{time.time()!r}".encode()
+
+    def validators(self, key: str, versions: List[str]) -> dict:
+        """ETag and Last-Modified headers for the response at key built at versions"""
+        modified = [self.started_at]
+        modified.extend(float(version.partition("@")[2]) for version in versions)
+        tag = f"{self.epoch}|{key}|{versions}"
+        if not self.backend.shared:
+            # Other workers' writes never reach this process, so rotate validators
+            # every ttl to bound how long a client can revalidate a stale copy
+            window = int(time.time() // self.ttl)
+            tag += f"|{window}"
+            modified.append(window * self.ttl)
+        return {
+            "ETag": '"' + hashlib.sha1(tag.encode()).hexdigest() + '"',
+            # HTTP dates have whole seconds: round up, so a write never predates its date
+            "Last-Modified": formatdate(math.ceil(max(modified)), usegmt=True),
+            "Cache-Control": "no-cache",  # Revalidate on every use instead of guessing freshness
+        }
+
+    def get(self, key: str, versions: List[str]) -> Optional[Tuple[dict, bytes]]:
+        """Cached (headers, body) for key if it was built at the given scope versions"""
+        cached = self.backend.get(key)
+        if cached is not None:
+            meta, body = cached.split(b"\n", 1)
+            meta = json.loads(meta)
+            if meta["versions"] == versions:
+                self.hits.inc()
+                return meta["headers"], body
+        self.misses.inc()
+        return None
+
+    def set(self, key: str, versions: List[str], headers: dict, body: bytes):
+        # Compact JSON never contains a raw newline, so it separates metadata from body
+        meta = json.dumps({"versions": versions, "headers": headers}).encode()
+        self.backend.set(key, meta + b"\n" + body, ex=self.ttl)
+
+    def invalidate(self, *scopes: str):
+        for scope in scopes:
+            self.version_store.set(f"{self.prefix}version:{scope}", self._new_version(), ex=self.version_ttl)
+
+def not_modified(if_none_match: Optional[str], if_modified_since: Optional[str], validators: dict) -> bool:
+    """Whether a GET with these conditional headers can be answered with 304 Not Modified"""
+    if if_none_match is not None:
+        # If-None-Match takes precedence; GET compares tags weakly, ignoring W/. "*" is
+        # left to a full response since the check runs before we know the resource exists
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return validators["ETag"] in tags
+    if if_modified_since is not None:
+        since = parsedate_tz(if_modified_since)
+        if since is None:
+            return False
+        last_modified = mktime_tz(parsedate_tz(validators["Last-Modified"]))
+        if last_modified >= time.time():
+            # A second write in this second would carry the same date, so the date
+            # only proves a copy current once the second is over
+            return False
+        return last_modified <= mktime_tz(since)
+    return False
\ No newline at end of file
@@ -0,0 +1,54 @@
+import threading
+import time
+from sqlalchemy import func, select
+
+class CachedCount:
+    """
+    Row count of a table kept in process memory so list endpoints don't run COUNT(*)
+    on every request. Write handlers adjust it in place, and it is recounted at most
+    every ttl seconds to pick up writes made by other workers.
+    The lock only guards the stored value, never the query: under run_sync or an
+    AsyncSession the query yields to the event loop, and a request blocking on the
+    lock there would stop the loop for good
+    """
+    
+    def __init__(self, model, ttl: float = 60.0):
+        self.model = model
+        self.ttl = ttl
+        self._value = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+    
+    def _cached(self):
+        with self._lock:
+            if self._value is None or time.monotonic() >= self._expires_at:
+                return None
+            return self._value
+    
+    def _store(self, value: int) -> int:
+        with self._lock:
+            self._value = value
+            self._expires_at = time.monotonic() + self.ttl
+        return value
+    
+    def get(self, db) -> int:
+        value = self._cached()
+        if value is None:
+            value = self._store(db.query(func.count(self.model.id)).scalar())
+        return value
+    
+    async def get_async(self, db) -> int:
+        """get() for an AsyncSession"""
+        value = self._cached()
+        if value is None:
+            value = self._store(await db.scalar(select(func.count(self.model.id))))
+        return value
+    
+    def add(self, delta: int):
+        with self._lock:
+            if self._value is not None:
+                self._value += delta
+    
+    def invalidate(self):
+        with self._lock:
+            self._value = None
\ No newline at end of file
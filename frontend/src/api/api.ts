@@ -17,6 +17,8 @@ export interface Venue {
   name: string;
   description: string;
   base_url?: string;
+  event_count?: number;  // With include=event_count
+  events?: Event[];      // With include=events
 }
 
 export interface Event {
@@ -35,7 +37,7 @@ export interface SearchResult {
 }
 
 export const venueApi = {
-  getAll: () => api.get<Venue[]>('/venues/'),
+  getAll: (include?: string) => api.get<Venue[]>('/venues/', { params: include ? { include } : undefined }),
   create: (data: Omit<Venue, 'id'>) => api.post<Venue>('/venues/', data),
   createBulk: (data: { bulk_input: string }) => api.post<Venue[]>('/venues/bulk', data),
   update: (id: number, data: Omit<Venue, 'id'>) => api.put<Venue>(`/venues/${id}`, data),
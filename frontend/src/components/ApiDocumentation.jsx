@@ -10,9 +10,9 @@ function ApiDocumentation() {
         {
           method: 'GET',
           path: '/venues/',
-          description: 'Get all venues',
-          parameters: 'None',
-          returns: 'List[VenueResponse]'
+          description: 'Get all venues, optionally one keyset page at a time (X-Total-Count and X-Next-After-Id headers)',
+          parameters: 'after_id: int?, limit: int? (max 1000), fields: string? - comma separated columns to return, include: "events" | "event_count"? - comma separated related data to embed (query parameters)',
+          returns: 'List[VenueResponse], with events: List[EventResponse] and/or event_count: int when included'
         },
         {
           method: 'POST',
@@ -35,6 +35,13 @@ function ApiDocumentation() {
           parameters: 'venue_id: int (path parameter)',
           returns: 'VenueResponse'
         },
+        {
+          method: 'POST',
+          path: '/venues/batch-get',
+          description: 'Get many venues by ID in one request, in the order requested',
+          parameters: '{"ids": List[int]} - at most 500',
+          returns: 'List[{"id": int, "found": bool, "venue": VenueResponse | null}]'
+        },
         {
           method: 'PUT',
           path: '/venues/{venue_id}',
@@ -48,6 +55,13 @@ function ApiDocumentation() {
           description: 'Delete a venue',
           parameters: 'venue_id: int (path parameter)',
           returns: '{"message": "Venue deleted successfully"}'
+        },
+        {
+          method: 'POST',
+          path: '/venues/{venue_id}/detect-base-url',
+          description: 'Recompute the venue base URL from all of its events',
+          parameters: 'venue_id: int (path parameter)',
+          returns: 'VenueResponse'
         }
       ]
     },
@@ -57,8 +71,8 @@ function ApiDocumentation() {
         {
           method: 'GET',
           path: '/events/',
-          description: 'Get all events across all venues',
-          parameters: 'None',
+          description: 'Get all events across all venues, optionally one keyset page at a time (X-Total-Count and X-Next-After-Id headers)',
+          parameters: 'after_id: int?, limit: int? (max 1000), fields: string? - comma separated columns to return (query parameters)',
           returns: 'List[EventResponse]'
         },
         {
@@ -75,6 +89,20 @@ function ApiDocumentation() {
           parameters: '{"venue_id": int, "bulk_input": string} - URLs or event IDs, one per line',
           returns: 'List[EventResponse]'
         },
+        {
+          method: 'POST',
+          path: '/events/import',
+          description: 'Import events for a venue from an NDJSON or CSV file upload, committed in batches',
+          parameters: 'venue_id: int (query), format: "ndjson" | "csv" (query, optional), file: multipart upload with url, name?, event_id?, date?, time? per row',
+          returns: 'NDJSON progress lines: {"rows_read", "created", "skipped", "invalid", "failed"}, last one with "done": true'
+        },
+        {
+          method: 'GET',
+          path: '/events/export',
+          description: 'Stream every event ordered by ID, for syncing to another system without loading the whole table',
+          parameters: 'format: "ndjson" | "csv" | "json" (query, default ndjson), after_id: int? - only events with a higher ID',
+          returns: 'NDJSON lines, CSV with a header row, or a JSON array of EventResponse'
+        },
         {
           method: 'GET',
           path: '/events/{event_id}',
@@ -82,6 +110,13 @@ function ApiDocumentation() {
           parameters: 'event_id: int (path parameter)',
           returns: 'EventResponse'
         },
+        {
+          method: 'POST',
+          path: '/events/batch-get',
+          description: 'Get many events by ID in one request, in the order requested',
+          parameters: '{"ids": List[int]} - at most 500',
+          returns: 'List[{"id": int, "found": bool, "event": EventResponse | null}]'
+        },
         {
           method: 'PUT',
           path: '/events/{event_id}',
@@ -99,8 +134,8 @@ function ApiDocumentation() {
         {
           method: 'GET',
           path: '/venues/{venue_id}/events/',
-          description: 'Get all events for a specific venue',
-          parameters: 'venue_id: int (path parameter)',
+          description: 'Get all events for a specific venue, optionally one keyset page at a time (X-Next-After-Id / X-Next-After-Date headers)',
+          parameters: 'venue_id: int (path), sort: "id" | "date", after_id: int?, after_date: string?, limit: int? (max 1000) (query)',
           returns: 'List[EventResponse]'
         },
         {
@@ -118,9 +153,23 @@ function ApiDocumentation() {
         {
           method: 'GET',
           path: '/search',
-          description: 'Search venues by name and events by event_id or name',
-          parameters: 'q: string (query parameter)',
+          description: 'Full-text search of venues by name and events by event_id or name; each word matches as a prefix, best matches first',
+          parameters: 'q: string, limit: int (default 50, max 1000), offset: int (query parameters)',
           returns: '{"venues": List[VenueResponse], "events": List[EventResponse]}'
+        },
+        {
+          method: 'GET',
+          path: '/search/suggest',
+          description: 'Typo-tolerant search-as-you-type suggestions for venue names and event IDs/names, served from an in-memory trigram index',
+          parameters: 'q: string, limit: int (default 10, max 50) (query parameters)',
+          returns: 'List[{"type": "venue" | "event", "id": int, "label": string}]'
+        },
+        {
+          method: 'GET',
+          path: '/metrics',
+          description: 'Prometheus text-format metrics, including the database connection pool checkout histogram and pool gauges',
+          parameters: 'None',
+          returns: 'text/plain (Prometheus exposition format)'
         }
       ]
     }
@@ -1,18 +1,52 @@
 import os
-from fastapi import FastAPI, Depends, HTTPException
+import io
+import csv
+import json
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Query, Request, Response
+from fastapi.responses import StreamingResponse, JSONResponse, ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, func, and_, or_, nullsfirst
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
-from pydantic import BaseModel
-from database import engine, get_db, Base
+from typing import List, Optional, Iterable, Iterator, Tuple
+from itertools import islice
+from functools import lru_cache
+from pydantic import BaseModel, Field, TypeAdapter
+from database import engine, get_db, get_async_db, SessionLocal, Base, insert_ignore, add_missing_columns, add_missing_indexes
 from models import Venue, Event
-from auth import get_api_key
-import secrets
-from datetime import datetime, timedelta
-from url_parser import extract_event_id_from_url, detect_base_url_pattern, parse_bulk_input
+from auth import get_api_key, api_keys, load_db_keys
+from counters import CachedCount
+from cache import MemoryCache, ResponseCache, not_modified
+from metrics import render_metrics
+from sessions import session_store, SESSION_LIFETIME
+from search import setup_search, search_venues, search_events
+from suggest import build_index, suggest_current, VENUE, EVENT
+from datetime import datetime
+
+try:
+    import orjson  # Optional: renders JSON responses several times faster
+except ImportError:
+    orjson = None
+from url_parser import extract_event_id_from_url, extract_event_ids, build_event_url, iter_lines, iter_bulk_input, BaseUrlPattern
 
 Base.metadata.create_all(bind=engine)
+add_missing_columns(engine, Base.metadata)
+add_missing_indexes(engine, Base.metadata)
+setup_search(engine)
+
+# Venues from before event counts were stored get theirs counted once
+with engine.begin() as conn:
+    conn.execute(
+        update(Venue).where(Venue.event_count.is_(None))
+        .values(event_count=select(func.count(Event.id)).where(Event.venue_id == Venue.id).scalar_subquery())
+    )
+
+# The suggest index is built at import, so every worker pays for it on startup
+# (a few seconds per 300k events) before it serves requests
+with SessionLocal() as db:
+    load_db_keys(api_keys, db)
+    suggest_index = build_index(db)
 
 app = FastAPI(title="Venue Management API", version="2.0.0")
 
@@ -36,9 +70,6 @@ HARDCODED_USERS = {
     }
 }
 
-# Session storage
-active_sessions = {}
-
 class UserLogin(BaseModel):
     username: str
     password: str
@@ -55,9 +86,6 @@ class LoginResponse(BaseModel):
     session_token: str
     message: str
 
-def create_session_token() -> str:
-    return secrets.token_urlsafe(32)
-
 # Configure CORS
 # Get allowed origins from environment or use defaults
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:5173,http://localhost:5175,https://enchanting-nasturtium-56f2a7.netlify.app").split(",")
@@ -75,6 +103,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-After-Id", "X-Next-After-Date", "ETag", "Last-Modified"],
 )
 
 # AUTH ENDPOINTS
@@ -98,13 +127,11 @@ def login_user(user_data: UserLogin):
         )
     
     # Create session
-    session_token = create_session_token()
-    active_sessions[session_token] = {
+    session_token = session_store.create({
         "user_id": user["id"],
         "username": user["username"],
-        "created_at": datetime.utcnow(),
-        "expires_at": datetime.utcnow() + timedelta(days=7)
-    }
+        "created_at": datetime.utcnow().isoformat()
+    }, datetime.utcnow() + SESSION_LIFETIME)
     
     # Create user response object
     user_response = UserResponse(
@@ -124,8 +151,7 @@ def login_user(user_data: UserLogin):
 @app.post("/auth/logout")
 def logout_user(session_token: str):
     """Logout user and invalidate session"""
-    if session_token in active_sessions:
-        del active_sessions[session_token]
+    if session_store.delete(session_token):
         return {"message": "Logout successful"}
     else:
         raise HTTPException(
@@ -136,7 +162,8 @@ def logout_user(session_token: str):
 @app.get("/auth/verify-session")
 def verify_session(session_token: str):
     """Verify if session is valid and return user info"""
-    session_data = active_sessions.get(session_token)
+    # Expired sessions are never returned by the store
+    session_data = session_store.get(session_token)
     
     if not session_data:
         raise HTTPException(
@@ -144,19 +171,11 @@ def verify_session(session_token: str):
             detail="Invalid or expired session"
         )
     
-    # Check if session is expired
-    if datetime.utcnow() > session_data["expires_at"]:
-        del active_sessions[session_token]
-        raise HTTPException(
-            status_code=401,
-            detail="Session expired"
-        )
-    
     # Get hardcoded user data
     username = session_data["username"]
     user = HARDCODED_USERS.get(username)
     if not user or not user["is_active"]:
-        del active_sessions[session_token]
+        session_store.delete(session_token)
         raise HTTPException(
             status_code=401,
             detail="User account not found or disabled"
@@ -189,7 +208,7 @@ class VenueResponse(VenueBase):
     base_url: Optional[str] = None
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 class EventBase(BaseModel):
     name: str
@@ -205,11 +224,11 @@ class EventUpdate(EventBase):
 
 class EventResponse(EventBase):
     id: int
-    venue_id: int
+    venue_id: Optional[int] = None  # Nullable in the events table
     event_id: Optional[str] = None
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 class BulkEventCreate(BaseModel):
     venue_id: int
@@ -218,30 +237,452 @@ class BulkEventCreate(BaseModel):
 class BulkVenueCreate(BaseModel):
     bulk_input: str  # Venue data, format: "Name | Description" per line
 
+MAX_BATCH_GET = 500  # One IN query, below SQLite's bound parameter limit
+
+class BatchGetRequest(BaseModel):
+    ids: List[int] = Field(..., max_length=MAX_BATCH_GET)
+
+class VenueBatchItem(BaseModel):
+    id: int
+    found: bool
+    venue: Optional[VenueResponse] = None
+
+class EventBatchItem(BaseModel):
+    id: int
+    found: bool
+    event: Optional[EventResponse] = None
+
 # Helper functions
-def update_venue_base_url(venue_id: int, db: Session):
-    """Update venue base URL based on existing events"""
-    events = db.query(Event).filter(Event.venue_id == venue_id).all()
-    if len(events) >= 2:
-        urls = [event.url for event in events]
-        base_url = detect_base_url_pattern(urls)
-        if base_url:
-            venue = db.query(Venue).filter(Venue.id == venue_id).first()
-            venue.base_url = base_url
-            db.commit()
+BULK_CHUNK_SIZE = 500  # Stays below SQLite's bound parameter limit
+MAX_PAGE_SIZE = 1000
+
+# Opt-in fast path for list responses: select plain column rows and render them
+# straight to JSON (with orjson when installed) instead of validating every row
+# through the response model. The JSON is the same either way
+FAST_JSON = os.getenv("FAST_JSON", "").lower() in ("1", "true", "yes")
+FastJSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+# Cached row counts served in the X-Total-Count header of list endpoints
+venue_count = CachedCount(Venue)
+event_count = CachedCount(Event)
+
+# Read-through cache and ETag/Last-Modified validators for GET responses (see
+# cache.py). MemoryCache is per process, so writes through another worker show up
+# after at most the TTL
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+response_cache = ResponseCache(
+    MemoryCache(int(os.getenv("RESPONSE_CACHE_SIZE", "1024")), int(os.getenv("RESPONSE_CACHE_BYTES", "67108864"))),
+    RESPONSE_CACHE_TTL,
+)
+
+@lru_cache
+def response_adapter(response_model) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+async def cached_json(request: Request, response: Response, scopes: List[str], response_model, load):
+    """
+    Serve a GET from the response cache, or await load() and cache what it returns
+    rendered through response_model; only X- headers set on response are kept.
+    A request whose If-None-Match/If-Modified-Since still matches gets a 304 before
+    anything is loaded or rendered
+    """
+    key = response_cache.key(request.url.path, request.query_params.multi_items())
+    versions = response_cache.versions(scopes)
+    validators = response_cache.validators(key, versions)
+    if not_modified(request.headers.get("if-none-match"), request.headers.get("if-modified-since"), validators):
+        return Response(status_code=304, headers=validators)
+    
+    cached = response_cache.get(key, versions)
+    if cached is not None:
+        headers, body = cached
+    else:
+        result = await load()
+        if isinstance(result, Response):
+            # Projected pages come back already rendered
+            headers, body = result.headers, result.body
+        else:
+            adapter = response_adapter(response_model)
+            content = adapter.dump_python(adapter.validate_python(result, from_attributes=True), mode="json")
+            headers, body = response.headers, JSONResponse(content).body
+        headers = {name: value for name, value in headers.items() if name.lower().startswith("x-")}
+        response_cache.set(key, versions, headers, body)
+    return Response(content=body, media_type="application/json", headers={**headers, **validators})
+
+def invalidate_venue_reads(venue_id: int, name: str, listing: bool = True):
+    """Make cached reads of one venue and its events stale; call after committing"""
+    scopes = [f"venue:{venue_id}", f"venue-name:{name}"]
+    if listing:
+        scopes.append("venues")
+    response_cache.invalidate(*scopes)
+
+def invalidate_event_reads(*event_ids: int):
+    """Make the cached event list and the given events stale; call after committing"""
+    response_cache.invalidate("events", *(f"event:{event_id}" for event_id in event_ids))
+
+def parse_fields(fields: Optional[str], response_model) -> Optional[List[str]]:
+    """
+    Validate a comma separated fields= projection; id is always included for paging
+    Without one, the fast path projects every field of the response model, in its order
+    """
+    if not fields:
+        return list(response_model.model_fields) if FAST_JSON else None
+    requested = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in requested if field not in response_model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return ["id"] + [field for field in requested if field != "id"]
+
+def list_page(model, after_id: Optional[int], limit: Optional[int], fields: Optional[List[str]],
+              db: Session, *criteria, options: tuple = ()) -> list:
+    """One keyset page of model rows ordered by primary key, optionally projected to fields"""
+    columns = [getattr(model, field) for field in fields] if fields else [model]
+    query = db.query(*columns).filter(*criteria).options(*options)
+    if after_id is not None:
+        query = query.filter(model.id > after_id)
+    query = query.order_by(model.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+def page_response(response: Response, rows: list, fields: Optional[List[str]],
+                  limit: Optional[int], total: Optional[int] = None):
+    """Attach paging headers; projected rows bypass the response model as plain JSON"""
+    headers = {}
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+    if limit is not None and len(rows) == limit:
+        headers["X-Next-After-Id"] = str(rows[-1].id)
+    
+    if fields:
+        # Keep paging headers the caller already set, as they would be without a projection
+        headers.update((name, value) for name, value in response.headers.items() if name.startswith("x-"))
+        return rows_response(rows, fields, headers)
+    response.headers.update(headers)
+    return rows
+
+def rows_response(rows: list, fields: List[str], headers: Optional[dict] = None) -> Response:
+    """Render projected rows as JSON objects with the given keys, skipping the response models"""
+    content = [{field: getattr(row, field) for field in fields} for row in rows]
+    if FAST_JSON:
+        return FastJSONResponse(content, headers=headers)
+    return JSONResponse(content, headers=headers)
+
+VENUE_INCLUDES = ("events", "event_count")
+
+def parse_include(include: Optional[str]) -> List[str]:
+    """Validate a comma separated include= list of related data to embed in venues"""
+    requested = [name.strip() for name in (include or "").split(",") if name.strip()]
+    unknown = [name for name in requested if name not in VENUE_INCLUDES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown include: {', '.join(unknown)}")
+    return requested
+
+def venues_response(venues: List[Venue], fields: Optional[List[str]], include: List[str],
+                    headers: Optional[dict] = None) -> Response:
+    """Render venues with their included events and/or event counts, skipping the response models"""
+    fields = fields or list(VenueResponse.model_fields)
+    event_fields = list(EventResponse.model_fields)
+    content = []
+    for venue in venues:
+        item = {field: getattr(venue, field) for field in fields}
+        if "event_count" in include:
+            item["event_count"] = venue.event_count
+        if "events" in include:
+            item["events"] = [
+                {field: getattr(event, field) for field in event_fields}
+                for event in sorted(venue.events, key=lambda event: event.id)
+            ]
+        content.append(item)
+    if FAST_JSON:
+        return FastJSONResponse(content, headers=headers)
+    return JSONResponse(content, headers=headers)
+
+def count_venue_events(venue_id: int, delta: int):
+    """Statement keeping Venue.event_count in step; execute it in the transaction that adds or deletes events"""
+    return update(Venue).where(Venue.id == venue_id).values(event_count=Venue.event_count + delta)
+
+async def batch_get(model, response_model, key: str, ids: List[int], db: AsyncSession):
+    """
+    Resolve ids with one IN query into items of {"id", "found", key} in request order;
+    ids that don't exist come back with found false and a null key
+    """
+    fields = parse_fields(None, response_model)
+    columns = [getattr(model, field) for field in fields] if fields else [model]
+    rows = (await db.execute(select(*columns).where(model.id.in_(set(ids))))).all()
+    if fields:
+        found = {row.id: {field: getattr(row, field) for field in fields} for row in rows}
+    else:
+        found = {row[0].id: row[0] for row in rows}
+    
+    items = [{"id": id, "found": id in found, key: found.get(id)} for id in ids]
+    return FastJSONResponse(items) if fields else items
+
+def load_base_url_pattern(venue: Venue) -> BaseUrlPattern:
+    return BaseUrlPattern(
+        count=venue.url_count,
+        domain=venue.url_domain,
+        path_prefix=venue.url_path_prefix,
+        mixed_domains=bool(venue.url_mixed_domains)
+    )
+
+def store_base_url_pattern(venue: Venue, pattern: BaseUrlPattern):
+    venue.url_count = pattern.count
+    venue.url_domain = pattern.domain
+    venue.url_path_prefix = pattern.path_prefix
+    venue.url_mixed_domains = pattern.mixed_domains
+    base_url = pattern.base_url
+    if base_url:
+        venue.base_url = base_url
+
+def lock_venue_url_state(venue: Venue, db: Session):
+    """
+    Lock the venue row until commit and re-read its base URL state, so concurrent
+    writers fold their URLs in one after another instead of overwriting each other
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        # No FOR UPDATE in SQLite; the first write takes the database write lock instead
+        db.execute(update(Venue).where(Venue.id == venue.id).values(url_count=Venue.url_count))
+    db.refresh(venue, ["url_count", "url_domain", "url_path_prefix", "url_mixed_domains", "base_url"],
+               with_for_update=True)
+
+def recompute_venue_base_url(venue: Venue, db: Session):
+    """Rebuild the venue base URL pattern from all of its events"""
+    lock_venue_url_state(venue, db)
+    pattern = BaseUrlPattern()
+    for (url,) in db.query(Event.url).filter(Event.venue_id == venue.id).yield_per(1000):
+        pattern.add(url)
+    store_base_url_pattern(venue, pattern)
+
+def update_venue_base_url(venue: Venue, new_urls: List[str], db: Session):
+    """Fold newly added event URLs into the venue base URL pattern"""
+    if venue.url_count is None:
+        # Venue predates incremental tracking, build its state once from all events
+        recompute_venue_base_url(venue, db)
+        return
+    
+    lock_venue_url_state(venue, db)
+    pattern = load_base_url_pattern(venue)
+    for url in new_urls:
+        pattern.add(url)
+    store_base_url_pattern(venue, pattern)
+
+def chunked(items: Iterable, size: int = BULK_CHUNK_SIZE) -> Iterator[list]:
+    """Yield successive lists of at most size items from any iterable"""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def find_existing(column, values: list, db: Session) -> set:
+    """Return the subset of values already stored in column, using chunked IN lookups"""
+    existing = set()
+    for chunk in chunked(values):
+        existing.update(value for (value,) in db.query(column).filter(column.in_(chunk)))
+    return existing
+
+def bulk_insert_returning(model, rows: List[dict], key: str, db: Session) -> List[dict]:
+    """
+    Insert rows with a single executemany, skipping conflicts, and return the
+    stored rows (including generated ids) in the order of rows.
+    Uses RETURNING when the dialect supports it for executemany (SQLite >= 3.35,
+    Postgres), otherwise a single re-select by the set of keys.
+    """
+    table = model.__table__
+    stmt = insert_ignore(db, table)
+    if db.get_bind().dialect.insert_executemany_returning:
+        result = db.execute(stmt.returning(*table.columns), rows)
+        stored = {row[key]: dict(row) for row in result.mappings()}
+    else:
+        db.execute(stmt, rows)
+        stored = {}
+        key_column = table.columns[key]
+        for chunk in chunked([row[key] for row in rows]):
+            result = db.execute(select(table).where(key_column.in_(chunk)))
+            stored.update((row[key], dict(row)) for row in result.mappings())
+    return [stored[row[key]] for row in rows if row[key] in stored]
+
+def iter_venue_lines(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """Lazily parse "Name | Description" lines into (name, description) tuples"""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if '|' in line:
+            parts = [part.strip() for part in line.split('|')]
+            name = parts[0]
+            description = parts[1] if len(parts) > 1 else ""
+        else:
+            name = line
+            description = ""
+        yield name, description
+
+def insert_venues(parsed_venues: List[Tuple[str, str]], db: Session) -> List[dict]:
+    """Insert one chunk of parsed venues, skipping names that already exist"""
+    unique_venues = {}
+    for name, description in parsed_venues:
+        unique_venues.setdefault(name, description)
+    
+    # Earlier chunks of the same transaction are visible here, so duplicates
+    # across chunks are skipped without remembering every name
+    existing_names = find_existing(Venue.name, list(unique_venues), db)
+    rows = [
+        {"name": name, "description": description}
+        for name, description in unique_venues.items()
+        if name not in existing_names
+    ]
+    if not rows:
+        return []
+    return bulk_insert_returning(Venue, rows, "name", db)
+
+def insert_events(parsed_events: List[dict], venue: Venue, created_so_far: int,
+                  db: Session) -> List[dict]:
+    """
+    Insert one chunk of parsed events for a venue, skipping existing URLs
+    Each parsed event has "url" and "event_id", and optionally "name", "date" and "time"
+    """
+    unique_events = {}
+    for parsed in parsed_events:
+        unique_events.setdefault(parsed["url"], parsed)
+    
+    # Skip URLs that already exist, resolved against the url index
+    existing_urls = find_existing(Event.url, list(unique_events), db)
+    
+    rows = []
+    for url, parsed in unique_events.items():
+        if url in existing_urls:
+            continue  # Skip duplicates
+            
+        # Generate a name from the event ID or URL
+        event_id = parsed["event_id"]
+        event_name = parsed.get("name") or event_id or f"Event {created_so_far + len(rows) + 1}"
+        rows.append({
+            "name": event_name,
+            "url": url,
+            "event_id": event_id,
+            "date": parsed.get("date"),
+            "time": parsed.get("time"),
+            "venue_id": venue.id
+        })
+    
+    if not rows:
+        return []
+    
+    # Rows that race with another writer are ignored by the insert
+    created_events = bulk_insert_returning(Event, rows, "url", db)
+    if created_events:
+        db.execute(count_venue_events(venue.id, len(created_events)))
+    
+    # Update venue base URL
+    update_venue_base_url(venue, [event["url"] for event in created_events], db)
+    
+    return created_events
+
+def iter_import_rows(lines: Iterable[str], file_format: str) -> Iterator[Optional[dict]]:
+    """
+    Lazily read uploaded event rows from NDJSON lines or CSV with a header row
+    Yields one dict per row, or None for a row that can't be read
+    """
+    if file_format == "csv":
+        for row in csv.DictReader(lines):
+            yield row if row.get("url") else None
+        return
+    
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield None
+            continue
+        yield row if isinstance(row, dict) and row.get("url") else None
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv", "json": "application/json"}
+EXPORT_BATCH_SIZE = 1000
+
+def iter_export(file_format: str, after_id: Optional[int] = None) -> Iterator[str]:
+    """
+    Stream every event as NDJSON lines, CSV with a header row, or one JSON array
+    Rows come from a server-side cursor EXPORT_BATCH_SIZE at a time, and each batch is
+    rendered and yielded before the next is fetched, so memory doesn't grow with the table
+    """
+    fields = list(EventResponse.model_fields)
+    query = select(*(getattr(Event, field) for field in fields)).order_by(Event.id)
+    if after_id is not None:
+        query = query.where(Event.id > after_id)
+    
+    # The request session may be closed before the body is streamed, so use our own
+    with SessionLocal() as export_db:
+        result = export_db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        if file_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(fields)
+            for batch in result.partitions():
+                writer.writerows(batch)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()  # Just the header row of an empty export
+        elif file_format == "json":
+            separator = "["
+            for batch in result.partitions():
+                yield separator + ",".join(json.dumps(dict(zip(fields, row))) for row in batch)
+                separator = ","
+            yield "]" if separator == "," else "[]"
+        else:
+            for batch in result.partitions():
+                yield "".join(json.dumps(dict(zip(fields, row))) + "\n" for row in batch)
+
+def import_field(row: dict, key: str) -> Optional[str]:
+    value = row.get(key)
+    return str(value) if value not in (None, "") else None
+
+def prepare_import_rows(rows: List[dict], base_url: Optional[str]) -> List[dict]:
+    """Normalise uploaded rows into parsed events, extracting missing event IDs in one batch"""
+    parsed_events = []
+    for row in rows:
+        url = str(row["url"]).strip()
+        event_id = import_field(row, "event_id")
+        if not url.startswith('http'):
+            # It's just an event ID, build the full URL if the venue has a base URL
+            event_id = event_id or url
+            if base_url:
+                url = build_event_url(base_url, url)
+        parsed_events.append({
+            "url": url,
+            "event_id": event_id,
+            "name": import_field(row, "name"),
+            "date": import_field(row, "date"),
+            "time": import_field(row, "time")
+        })
+    
+    missing = [parsed for parsed in parsed_events if parsed["event_id"] is None]
+    for parsed, event_id in zip(missing, extract_event_ids(parsed["url"] for parsed in missing)):
+        parsed["event_id"] = event_id
+    return parsed_events
 
 # API endpoints
+# Handlers run on the event loop with an AsyncSession; the sync helpers above are
+# reused through run_sync(), which executes them against the same async connection
 @app.post("/venues/", response_model=VenueResponse, dependencies=[Depends(get_api_key)])
-def create_venue(venue: VenueCreate, db: Session = Depends(get_db)):
+async def create_venue(venue: VenueCreate, db: AsyncSession = Depends(get_async_db)):
     db_venue = Venue(name=venue.name, description=venue.description)
     db.add(db_venue)
     
     try:
-        db.commit()
-        db.refresh(db_venue)
+        await db.commit()
+        venue_count.add(1)
+        response_cache.invalidate("venues")
+        await db.refresh(db_venue)
+        suggest_index.add_venue(db_venue.id, db_venue.name)
         return db_venue
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         # Check if it's a venue name unique constraint violation
         if "name" in str(e.orig).lower():
             raise HTTPException(status_code=400, detail="Venue with this name already exists")
@@ -249,82 +690,122 @@ def create_venue(venue: VenueCreate, db: Session = Depends(get_db)):
             raise HTTPException(status_code=400, detail="Venue already exists")
 
 @app.post("/venues/bulk", response_model=List[VenueResponse], dependencies=[Depends(get_api_key)])
-def create_bulk_venues(bulk_data: BulkVenueCreate, db: Session = Depends(get_db)):
-    lines = [line.strip() for line in bulk_data.bulk_input.split('\n') if line.strip()]
+async def create_bulk_venues(bulk_data: BulkVenueCreate, db: AsyncSession = Depends(get_async_db)):
     created_venues = []
     
-    for line in lines:
-        if '|' in line:
-            parts = [part.strip() for part in line.split('|')]
-            name = parts[0]
-            description = parts[1] if len(parts) > 1 else ""
-        else:
-            name = line
-            description = ""
-        
-        # Check if venue already exists
-        existing_venue = db.query(Venue).filter(Venue.name == name).first()
-        if existing_venue:
-            continue  # Skip duplicates
-            
-        db_venue = Venue(name=name, description=description)
-        db.add(db_venue)
-        created_venues.append(db_venue)
-    
     try:
-        db.commit()
-        for venue in created_venues:
-            db.refresh(venue)
+        for parsed_venues in chunked(iter_venue_lines(iter_lines(bulk_data.bulk_input))):
+            created_venues.extend(await db.run_sync(lambda session: insert_venues(parsed_venues, session)))
+        await db.commit()
+        venue_count.add(len(created_venues))
+        response_cache.invalidate("venues")
+        for created in created_venues:
+            suggest_index.add_venue(created["id"], created["name"])
         return created_venues
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Failed to create some venues")
 
 @app.get("/venues/", response_model=List[VenueResponse], dependencies=[Depends(get_api_key)])
-def get_venues(db: Session = Depends(get_db)):
-    return db.query(Venue).all()
+async def get_venues(request: Request, response: Response, after_id: Optional[int] = None,
+                     limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                     fields: Optional[str] = None, include: Optional[str] = None,
+                     db: AsyncSession = Depends(get_async_db)):
+    """
+    include=events embeds each venue's events, loaded for the whole page in one more
+    query; include=event_count adds the stored count without reading the events table
+    """
+    fields = parse_fields(fields, VenueResponse)
+    include = parse_include(include)
+    
+    async def load():
+        if not include:
+            venues = await db.run_sync(lambda session: list_page(Venue, after_id, limit, fields, session))
+            return page_response(response, venues, fields, limit, await venue_count.get_async(db))
+        
+        options = (selectinload(Venue.events),) if "events" in include else ()
+        venues = await db.run_sync(lambda session: list_page(Venue, after_id, limit, None, session, options=options))
+        page_response(response, venues, None, limit, await venue_count.get_async(db))
+        return venues_response(venues, fields, include, response.headers)
+    
+    # Event writes bump "events", which covers both embedded events and counts
+    scopes = ["venues", "events"] if include else ["venues"]
+    return await cached_json(request, response, scopes, List[VenueResponse], load)
 
 @app.get("/venues/{venue_id}", response_model=VenueResponse, dependencies=[Depends(get_api_key)])
-def get_venue(venue_id: int, db: Session = Depends(get_db)):
-    venue = db.query(Venue).filter(Venue.id == venue_id).first()
-    if not venue:
-        raise HTTPException(status_code=404, detail="Venue not found")
-    return venue
+async def get_venue(venue_id: int, request: Request, response: Response,
+                    db: AsyncSession = Depends(get_async_db)):
+    async def load():
+        venue = await db.get(Venue, venue_id)
+        if not venue:
+            raise HTTPException(status_code=404, detail="Venue not found")
+        return venue
+    
+    return await cached_json(request, response, [f"venue:{venue_id}"], VenueResponse, load)
+
+@app.post("/venues/batch-get", response_model=List[VenueBatchItem], dependencies=[Depends(get_api_key)])
+async def batch_get_venues(batch: BatchGetRequest, db: AsyncSession = Depends(get_async_db)):
+    """Get up to MAX_BATCH_GET venues by id in one request"""
+    return await batch_get(Venue, VenueResponse, "venue", batch.ids, db)
 
 @app.put("/venues/{venue_id}", response_model=VenueResponse, dependencies=[Depends(get_api_key)])
-def update_venue(venue_id: int, venue: VenueCreate, db: Session = Depends(get_db)):
-    db_venue = db.query(Venue).filter(Venue.id == venue_id).first()
+async def update_venue(venue_id: int, venue: VenueCreate, db: AsyncSession = Depends(get_async_db)):
+    db_venue = await db.get(Venue, venue_id)
     if not db_venue:
         raise HTTPException(status_code=404, detail="Venue not found")
     
+    old_name = db_venue.name
     db_venue.name = venue.name
     db_venue.description = venue.description
     
     try:
-        db.commit()
-        db.refresh(db_venue)
+        await db.commit()
+        invalidate_venue_reads(venue_id, old_name)
+        await db.refresh(db_venue)
+        suggest_index.add_venue(db_venue.id, db_venue.name)
         return db_venue
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         if "name" in str(e.orig).lower():
             raise HTTPException(status_code=400, detail="Venue with this name already exists")
         else:
             raise HTTPException(status_code=400, detail="Update failed")
 
 @app.delete("/venues/{venue_id}", dependencies=[Depends(get_api_key)])
-def delete_venue(venue_id: int, db: Session = Depends(get_db)):
-    venue = db.query(Venue).filter(Venue.id == venue_id).first()
+async def delete_venue(venue_id: int, db: AsyncSession = Depends(get_async_db)):
+    venue = await db.get(Venue, venue_id)
     if not venue:
         raise HTTPException(status_code=404, detail="Venue not found")
     
-    db.delete(venue)
-    db.commit()
+    event_ids = (await db.scalars(select(Event.id).where(Event.venue_id == venue_id))).all()
+    await db.delete(venue)
+    await db.commit()
+    venue_count.add(-1)
+    event_count.invalidate()  # Its events were deleted with it
+    invalidate_venue_reads(venue_id, venue.name)
+    invalidate_event_reads(*event_ids)
+    suggest_index.remove(VENUE, venue_id)
+    for event_id in event_ids:
+        suggest_index.remove(EVENT, event_id)
     return {"message": "Venue deleted successfully"}
 
+@app.post("/venues/{venue_id}/detect-base-url", response_model=VenueResponse, dependencies=[Depends(get_api_key)])
+async def detect_venue_base_url(venue_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Recompute the venue base URL from all of its events"""
+    venue = await db.get(Venue, venue_id)
+    if not venue:
+        raise HTTPException(status_code=404, detail="Venue not found")
+    
+    await db.run_sync(lambda session: recompute_venue_base_url(venue, session))
+    await db.commit()
+    invalidate_venue_reads(venue_id, venue.name)
+    await db.refresh(venue)
+    return venue
+
 @app.post("/events/", response_model=EventResponse, dependencies=[Depends(get_api_key)])
-def create_event(event: EventCreate, db: Session = Depends(get_db)):
+async def create_event(event: EventCreate, db: AsyncSession = Depends(get_async_db)):
     # Check if venue exists
-    venue = db.query(Venue).filter(Venue.id == event.venue_id).first()
+    venue = await db.get(Venue, event.venue_id)
     if not venue:
         raise HTTPException(status_code=404, detail="Venue not found")
     
@@ -340,17 +821,25 @@ def create_event(event: EventCreate, db: Session = Depends(get_db)):
         venue_id=event.venue_id
     )
     db.add(db_event)
+    base_url = venue.base_url
     
     try:
-        db.commit()
-        db.refresh(db_event)
+        await db.flush()
+        await db.execute(count_venue_events(venue.id, 1))
         
         # Update venue base URL if we have enough events to detect pattern
-        update_venue_base_url(venue.id, db)
+        await db.run_sync(lambda session: update_venue_base_url(venue, [db_event.url], session))
         
+        await db.commit()
+        event_count.add(1)
+        # The venue list only shows the venue's base URL, which most events leave alone
+        invalidate_venue_reads(venue.id, venue.name, listing=venue.base_url != base_url)
+        invalidate_event_reads()
+        await db.refresh(db_event)
+        suggest_index.add_event(db_event.id, db_event.event_id, db_event.name)
         return db_event
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         # Check if it's a URL unique constraint violation
         if "url" in str(e.orig).lower():
             raise HTTPException(status_code=400, detail="Event with this URL already exists")
@@ -358,123 +847,292 @@ def create_event(event: EventCreate, db: Session = Depends(get_db)):
             raise HTTPException(status_code=400, detail="Event already exists")
 
 @app.post("/events/bulk", response_model=List[EventResponse], dependencies=[Depends(get_api_key)])
-def create_bulk_events(bulk_data: BulkEventCreate, db: Session = Depends(get_db)):
+async def create_bulk_events(bulk_data: BulkEventCreate, db: AsyncSession = Depends(get_async_db)):
     # Check if venue exists
-    venue = db.query(Venue).filter(Venue.id == bulk_data.venue_id).first()
+    venue = await db.get(Venue, bulk_data.venue_id)
     if not venue:
         raise HTTPException(status_code=404, detail="Venue not found")
     
-    # Parse bulk input
-    parsed_events = parse_bulk_input(bulk_data.bulk_input, venue.base_url)
-    
+    # Parse the input lazily and insert it chunk by chunk
+    parsed_events = (
+        {"url": url, "event_id": event_id}
+        for url, event_id in iter_bulk_input(iter_lines(bulk_data.bulk_input), venue.base_url)
+    )
     created_events = []
-    for url, event_id in parsed_events:
-        # Check if event with this URL already exists
-        existing_event = db.query(Event).filter(Event.url == url).first()
-        if existing_event:
-            continue  # Skip duplicates
-            
-        # Generate a name from the event ID or URL
-        event_name = event_id if event_id else f"Event {len(created_events) + 1}"
-        
-        db_event = Event(
-            name=event_name,
-            url=url,
-            event_id=event_id,
-            venue_id=bulk_data.venue_id
-        )
-        db.add(db_event)
-        created_events.append(db_event)
+    base_url = venue.base_url
     
     try:
-        db.commit()
-        for event in created_events:
-            db.refresh(event)
-            
-        # Update venue base URL
-        update_venue_base_url(venue.id, db)
-        
-        return created_events
+        for chunk in chunked(parsed_events):
+            created_events.extend(await db.run_sync(
+                lambda session: insert_events(chunk, venue, len(created_events), session)
+            ))
+        await db.commit()
+        event_count.add(len(created_events))
+        invalidate_venue_reads(venue.id, venue.name, listing=venue.base_url != base_url)
+        invalidate_event_reads()
+        for created in created_events:
+            suggest_index.add_event(created["id"], created["event_id"], created["name"])
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Failed to create some events")
+    
+    return created_events
+
+@app.post("/events/import", dependencies=[Depends(get_api_key)])
+def import_events(venue_id: int, file: UploadFile = File(...), format: Optional[str] = None,
+                  db: Session = Depends(get_db)):
+    """
+    Import events for a venue from an NDJSON or CSV upload
+    Rows are read as they are parsed and committed in batches; the response streams
+    one NDJSON progress line per batch followed by a final summary
+    """
+    venue = db.query(Venue).filter(Venue.id == venue_id).first()
+    if not venue:
+        raise HTTPException(status_code=404, detail="Venue not found")
+    
+    file_format = format or ("csv" if (file.filename or "").lower().endswith(".csv") else "ndjson")
+    if file_format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="Format must be csv or ndjson")
+    
+    def progress():
+        # The request session may be closed before the body is streamed, so use our own
+        import_db = SessionLocal()
+        lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+        import_venue = import_db.query(Venue).filter(Venue.id == venue_id).first()
+        base_url = import_venue.base_url
+        counts = {"rows_read": 0, "created": 0, "skipped": 0, "invalid": 0, "failed": 0}
+        try:
+            for batch in chunked(iter_import_rows(lines, file_format)):
+                rows = [row for row in batch if row is not None]
+                counts["rows_read"] += len(batch)
+                counts["invalid"] += len(batch) - len(rows)
+                try:
+                    created = insert_events(prepare_import_rows(rows, base_url), import_venue,
+                                            counts["created"], import_db)
+                    import_db.commit()
+                    event_count.add(len(created))
+                    invalidate_venue_reads(venue_id, import_venue.name,
+                                           listing=import_venue.base_url != base_url)
+                    invalidate_event_reads()
+                    for event in created:
+                        suggest_index.add_event(event["id"], event["event_id"], event["name"])
+                    counts["created"] += len(created)
+                    counts["skipped"] += len(rows) - len(created)
+                except IntegrityError:
+                    import_db.rollback()
+                    counts["failed"] += len(rows)
+                yield json.dumps(counts) + "\n"
+        except (UnicodeDecodeError, csv.Error) as e:
+            yield json.dumps({**counts, "error": str(e)}) + "\n"
+        except Exception as e:
+            # Earlier batches are committed; report how far we got instead of cutting
+            # the stream off mid-response
+            import_db.rollback()
+            yield json.dumps({**counts, "error": f"{type(e).__name__}: {e}"}) + "\n"
+        finally:
+            lines.detach()
+            import_db.close()
+        yield json.dumps({**counts, "done": True}) + "\n"
+    
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
 
 @app.get("/events/", response_model=List[EventResponse], dependencies=[Depends(get_api_key)])
-def get_all_events(db: Session = Depends(get_db)):
-    return db.query(Event).all()
+async def get_all_events(request: Request, response: Response, after_id: Optional[int] = None,
+                         limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                         fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    fields = parse_fields(fields, EventResponse)
+    
+    async def load():
+        events = await db.run_sync(lambda session: list_page(Event, after_id, limit, fields, session))
+        return page_response(response, events, fields, limit, await event_count.get_async(db))
+    
+    return await cached_json(request, response, ["events"], List[EventResponse], load)
+
+@app.get("/events/export", dependencies=[Depends(get_api_key)])
+def export_events(format: str = "ndjson", after_id: Optional[int] = None):
+    """
+    Stream all events ordered by id as NDJSON, CSV or a JSON array
+    after_id resumes an export, or picks up only events added since the last one
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Format must be ndjson, csv or json")
+    
+    return StreamingResponse(
+        iter_export(format, after_id),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="events.{format}"'}
+    )
 
 @app.get("/events/{event_id}", response_model=EventResponse, dependencies=[Depends(get_api_key)])
-def get_event(event_id: int, db: Session = Depends(get_db)):
-    event = db.query(Event).filter(Event.id == event_id).first()
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    return event
+async def get_event(event_id: int, request: Request, response: Response,
+                    db: AsyncSession = Depends(get_async_db)):
+    async def load():
+        event = await db.get(Event, event_id)
+        if not event:
+            raise HTTPException(status_code=404, detail="Event not found")
+        return event
+    
+    return await cached_json(request, response, [f"event:{event_id}"], EventResponse, load)
+
+@app.post("/events/batch-get", response_model=List[EventBatchItem], dependencies=[Depends(get_api_key)])
+async def batch_get_events(batch: BatchGetRequest, db: AsyncSession = Depends(get_async_db)):
+    """Get up to MAX_BATCH_GET events by id in one request"""
+    return await batch_get(Event, EventResponse, "event", batch.ids, db)
 
 @app.put("/events/{event_id}", response_model=EventResponse, dependencies=[Depends(get_api_key)])
-def update_event(event_id: int, event: EventUpdate, db: Session = Depends(get_db)):
-    db_event = db.query(Event).filter(Event.id == event_id).first()
+async def update_event(event_id: int, event: EventUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_event = await db.get(Event, event_id)
     if not db_event:
         raise HTTPException(status_code=404, detail="Event not found")
     
+    url_changed = db_event.url != event.url
     db_event.name = event.name
     db_event.url = event.url
     db_event.date = event.date
     db_event.time = event.time
     
+    venue = await db.get(Venue, db_event.venue_id) if db_event.venue_id is not None else None
+    base_url = venue.base_url if venue else None
+    
     try:
-        db.commit()
-        db.refresh(db_event)
+        if url_changed:
+            await db.flush()
+            if venue:
+                await db.run_sync(lambda session: recompute_venue_base_url(venue, session))
+        await db.commit()
+        if venue:
+            invalidate_venue_reads(venue.id, venue.name, listing=venue.base_url != base_url)
+        invalidate_event_reads(event_id)
+        await db.refresh(db_event)
+        suggest_index.add_event(db_event.id, db_event.event_id, db_event.name)
         return db_event
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         if "url" in str(e.orig).lower():
             raise HTTPException(status_code=400, detail="Event with this URL already exists")
         else:
             raise HTTPException(status_code=400, detail="Update failed")
 
 @app.delete("/events/{event_id}", dependencies=[Depends(get_api_key)])
-def delete_event(event_id: int, db: Session = Depends(get_db)):
-    event = db.query(Event).filter(Event.id == event_id).first()
+async def delete_event(event_id: int, db: AsyncSession = Depends(get_async_db)):
+    event = await db.get(Event, event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     
-    db.delete(event)
-    db.commit()
+    venue = await db.get(Venue, event.venue_id) if event.venue_id is not None else None
+    base_url = venue.base_url if venue else None
+    await db.delete(event)
+    await db.flush()
+    if venue:
+        await db.execute(count_venue_events(venue.id, -1))
+        await db.run_sync(lambda session: recompute_venue_base_url(venue, session))
+    await db.commit()
+    event_count.add(-1)
+    if venue:
+        invalidate_venue_reads(venue.id, venue.name, listing=venue.base_url != base_url)
+    invalidate_event_reads(event_id)
+    suggest_index.remove(EVENT, event_id)
     return {"message": "Event deleted successfully"}
 
 @app.get("/venues/{venue_id}/events/", response_model=List[EventResponse], dependencies=[Depends(get_api_key)])
-def get_venue_events(venue_id: int, db: Session = Depends(get_db)):
-    # Check if venue exists
-    venue = db.query(Venue).filter(Venue.id == venue_id).first()
-    if not venue:
+async def get_venue_events(venue_id: int, request: Request, response: Response, after_id: Optional[int] = None,
+                           after_date: Optional[str] = None, sort: str = Query("id", pattern="^(id|date)$"),
+                           limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                           db: AsyncSession = Depends(get_async_db)):
+    return await cached_json(
+        request, response, [f"venue:{venue_id}"], List[EventResponse],
+        lambda: load_venue_events(venue_id, response, after_id, after_date, sort, limit, db)
+    )
+
+async def load_venue_events(venue_id: int, response: Response, after_id: Optional[int],
+                            after_date: Optional[str], sort: str, limit: Optional[int], db: AsyncSession):
+    fields = parse_fields(None, EventResponse)
+    # Keyset condition for the page, served by the (venue_id, id) or (venue_id, date) index
+    join_on = [Event.venue_id == Venue.id]
+    if sort == "date":
+        order_by = (nullsfirst(Event.date), Event.id)
+        if after_id is not None:
+            if after_date is None:
+                join_on.append(or_(and_(Event.date.is_(None), Event.id > after_id), Event.date.isnot(None)))
+            else:
+                join_on.append(or_(Event.date > after_date, and_(Event.date == after_date, Event.id > after_id)))
+    else:
+        order_by = (Event.id,)
+        if after_id is not None:
+            join_on.append(Event.id > after_id)
+    
+    # Check the venue exists in the same query: no rows means no venue, and a venue
+    # without (further) events comes back as a single row with no event
+    columns = [getattr(Event, field) for field in fields] if fields else [Event]
+    query = (
+        select(Venue.id.label("venue_found"), *columns)
+        .outerjoin(Event, and_(*join_on))
+        .where(Venue.id == venue_id)
+        .order_by(*order_by)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    rows = (await db.execute(query)).all()
+    if not rows:
         raise HTTPException(status_code=404, detail="Venue not found")
     
-    return db.query(Event).filter(Event.venue_id == venue_id).all()
+    if fields:
+        events = [row for row in rows if row.id is not None]
+    else:
+        events = [event for _, event in rows if event is not None]
+    if sort == "date" and limit is not None and len(events) == limit and events[-1].date is not None:
+        response.headers["X-Next-After-Date"] = events[-1].date
+    return page_response(response, events, fields, limit)
 
 @app.get("/venues/by-name/{venue_name}/events/", response_model=List[EventResponse], dependencies=[Depends(get_api_key)])
-def get_venue_events_by_name(venue_name: str, db: Session = Depends(get_db)):
-    # Find venue by name
-    venue = db.query(Venue).filter(Venue.name == venue_name).first()
-    if not venue:
-        raise HTTPException(status_code=404, detail="Venue not found")
+async def get_venue_events_by_name(venue_name: str, request: Request, response: Response,
+                                   db: AsyncSession = Depends(get_async_db)):
+    async def load():
+        # Find venue by name
+        venue = await db.scalar(select(Venue).where(Venue.name == venue_name))
+        if not venue:
+            raise HTTPException(status_code=404, detail="Venue not found")
+        
+        fields = parse_fields(None, EventResponse)
+        if fields:
+            columns = [getattr(Event, field) for field in fields]
+            return rows_response((await db.execute(select(*columns).where(Event.venue_id == venue.id))).all(), fields)
+        return (await db.scalars(select(Event).where(Event.venue_id == venue.id))).all()
     
-    return db.query(Event).filter(Event.venue_id == venue.id).all()
+    return await cached_json(request, response, [f"venue-name:{venue_name}"], List[EventResponse], load)
 
 class SearchResult(BaseModel):
     venues: List[VenueResponse]
     events: List[EventResponse]
 
 @app.get("/search", response_model=SearchResult, dependencies=[Depends(get_api_key)])
-def search(q: str, db: Session = Depends(get_db)):
-    """Search venues by name and events by event_id or name"""
-    
-    # Search venues by name (case insensitive partial match)
-    venues = db.query(Venue).filter(Venue.name.ilike(f"%{q}%")).all()
+async def search(q: str, limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE), offset: int = Query(0, ge=0),
+                 db: AsyncSession = Depends(get_async_db)):
+    """Search venues by name and events by event_id or name, best matches first"""
     
-    # Search events by event_id or name (case insensitive partial match)
-    events = db.query(Event).filter(
-        (Event.event_id.ilike(f"%{q}%")) | 
-        (Event.name.ilike(f"%{q}%"))
-    ).all()
+    # Each word of q is matched as a prefix through the full-text index
+    venues = await db.run_sync(lambda session: search_venues(q, limit, offset, session))
+    events = await db.run_sync(lambda session: search_events(q, limit, offset, session))
     
-    return SearchResult(venues=venues, events=events)
\ No newline at end of file
+    return SearchResult(venues=venues, events=events)
+
+class Suggestion(BaseModel):
+    type: str
+    id: int
+    label: str
+
+@app.get("/search/suggest", response_model=List[Suggestion], dependencies=[Depends(get_api_key)])
+def suggest(q: str, limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_db)):
+    """
+    Typo-tolerant search-as-you-type over venue names and event IDs/names, ranked from
+    memory; the few suggestions returned are checked against the database by id
+    """
+    return [
+        Suggestion(type=kind, id=doc_id, label=label)
+        for kind, doc_id, label in suggest_current(suggest_index, q, limit, db)
+    ]
+
+@app.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(get_api_key)])
+def metrics():
+    """Process metrics in Prometheus text format, including connection pool checkouts"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
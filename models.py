@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -9,10 +9,22 @@ class Venue(Base):
     name = Column(String, unique=True, index=True)
     description = Column(String)
     base_url = Column(String, nullable=True)  # Base URL pattern for events
+    # Running state behind base_url (see url_parser.BaseUrlPattern); NULL url_count means not yet tracked
+    url_count = Column(Integer, nullable=True, default=0)
+    url_domain = Column(String, nullable=True)
+    url_path_prefix = Column(String, nullable=True)
+    url_mixed_domains = Column(Boolean, nullable=True, default=False)
+    # Number of events, kept in step by the event write handlers; NULL until backfilled
+    event_count = Column(Integer, nullable=True, default=0)
     events = relationship("Event", back_populates="venue", cascade="all, delete-orphan")
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        # Venue event pages, by id (keyset) and by date
+        Index("ix_events_venue_id_id", "venue_id", "id"),
+        Index("ix_events_venue_id_date", "venue_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -21,4 +33,12 @@ class Event(Base):
     date = Column(String, nullable=True)
     time = Column(String, nullable=True)
     venue_id = Column(Integer, ForeignKey("venues.id"))
-    venue = relationship("Venue", back_populates="events")
\ No newline at end of file
+    venue = relationship("Venue", back_populates="events")
+
+class ApiKey(Base):
+    __tablename__ = "api_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)  # The integration using the key
+    key_hash = Column(String, unique=True, nullable=False)  # SHA-256 hex digest; the key itself isn't stored
+    is_active = Column(Boolean, default=True)
\ No newline at end of file
@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from metrics import Counter, Gauge
+
+# PBKDF2 password hashes and the bounded executor that computes them off the request
+# threads. Hashes are stored as pbkdf2_sha256$<iterations>$<salt>$<hash>; older ones
+# are salt$hash at 100,000 iterations and get rehashed on the next login
+PBKDF2_ITERATIONS = int(os.getenv("PBKDF2_ITERATIONS", "100000"))
+LEGACY_ITERATIONS = 100000
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "32"))
+
+def _pbkdf2(password: str, salt: str, iterations: int) -> str:
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), iterations).hex()
+
+def hash_password(password: str) -> str:
+    """Hash a password with a random salt at PBKDF2_ITERATIONS"""
+    salt = secrets.token_hex(32)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${salt}${_pbkdf2(password, salt, PBKDF2_ITERATIONS)}"
+
+def _parse(hashed_password: str):
+    parts = hashed_password.split('$')
+    if len(parts) == 2:
+        return LEGACY_ITERATIONS, parts[0], parts[1]
+    if len(parts) == 4 and parts[0] == "pbkdf2_sha256":
+        return int(parts[1]), parts[2], parts[3]
+    raise ValueError("Unknown password hash format")
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash in either format"""
+    try:
+        iterations, salt, stored_hash = _parse(hashed_password)
+    except ValueError:
+        return False
+    return hmac.compare_digest(_pbkdf2(password, salt, iterations), stored_hash)
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Whether a hash is in the old format or uses other than PBKDF2_ITERATIONS"""
+    try:
+        iterations = _parse(hashed_password)[0]
+    except ValueError:
+        return True
+    return not hashed_password.startswith("pbkdf2_sha256$") or iterations != PBKDF2_ITERATIONS
+
+class PasswordHasherBusy(Exception):
+    """Every worker is busy and the queue is full"""
+
+class PasswordHasher:
+    """
+    Runs hashing on its own threads, so a burst of logins can't take the threadpool
+    the sync endpoints run on; pbkdf2_hmac releases the GIL, so the workers hash in
+    parallel. At most workers + queue_limit jobs are accepted at a time
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, queue_limit: int = PASSWORD_HASH_QUEUE):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self.rejected = Counter("password_hash_rejected_total", "Password hashing jobs refused because the queue was full")
+        Gauge("password_hash_in_flight", "Password hashing jobs running or queued", lambda: self.in_flight)
+
+    async def run(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            self.rejected.inc()
+            raise PasswordHasherBusy()
+        with self._lock:
+            self.in_flight += 1
+        future = self._executor.submit(function, *args)
+        # Free the slot when the job finishes, even if the request awaiting it is cancelled
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, password, hashed_password)
+
+password_hasher = PasswordHasher()
\ No newline at end of file
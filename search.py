@@ -0,0 +1,123 @@
+import re
+from typing import List
+from sqlalchemy import text, func, or_, literal_column
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import table, column
+from models import Venue, Event
+
+# Full-text search over venue names and event IDs/names.
+# SQLite: external-content FTS5 tables kept in sync by triggers, so bulk inserts
+# that bypass the ORM are indexed too. Postgres: GIN indexes over tsvector
+# expressions, which need no syncing. Anything else falls back to ILIKE.
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS venues_fts USING fts5("
+    "name, content='venues', content_rowid='id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS venues_fts_insert AFTER INSERT ON venues BEGIN "
+    "INSERT INTO venues_fts(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS venues_fts_delete AFTER DELETE ON venues BEGIN "
+    "INSERT INTO venues_fts(venues_fts, rowid, name) VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS venues_fts_update AFTER UPDATE OF name ON venues BEGIN "
+    "INSERT INTO venues_fts(venues_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+    "INSERT INTO venues_fts(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5("
+    "event_id, name, content='events', content_rowid='id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN "
+    "INSERT INTO events_fts(rowid, event_id, name) VALUES (new.id, new.event_id, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN "
+    "INSERT INTO events_fts(events_fts, rowid, event_id, name) "
+    "VALUES ('delete', old.id, old.event_id, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_update AFTER UPDATE OF event_id, name ON events BEGIN "
+    "INSERT INTO events_fts(events_fts, rowid, event_id, name) "
+    "VALUES ('delete', old.id, old.event_id, old.name); "
+    "INSERT INTO events_fts(rowid, event_id, name) VALUES (new.id, new.event_id, new.name); END",
+]
+
+VENUE_TSVECTOR = "to_tsvector('simple', coalesce(venues.name, ''))"
+EVENT_TSVECTOR = "to_tsvector('simple', coalesce(events.event_id, '') || ' ' || coalesce(events.name, ''))"
+
+POSTGRES_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_venues_name_tsv ON venues USING gin ({VENUE_TSVECTOR})",
+    f"CREATE INDEX IF NOT EXISTS ix_events_search_tsv ON events USING gin ({EVENT_TSVECTOR})",
+]
+
+venues_fts = table("venues_fts", column("rowid"), column("rank"))
+events_fts = table("events_fts", column("rowid"), column("rank"))
+
+# Which engine setup_search() managed to enable: "fts5", "tsvector" or None for ILIKE
+search_backend = None
+
+def setup_search(bind):
+    """Create the full-text search structures for the bound database, if it supports them"""
+    global search_backend
+
+    if bind.dialect.name == "sqlite":
+        try:
+            with bind.begin() as conn:
+                existing = {
+                    name for (name,) in conn.execute(text(
+                        "SELECT name FROM sqlite_master WHERE name IN ('venues_fts', 'events_fts')"
+                    ))
+                }
+                for statement in SQLITE_FTS_DDL:
+                    conn.execute(text(statement))
+                # Index rows that were stored before the FTS tables existed
+                if "venues_fts" not in existing:
+                    conn.execute(text("INSERT INTO venues_fts(venues_fts) VALUES ('rebuild')"))
+                if "events_fts" not in existing:
+                    conn.execute(text("INSERT INTO events_fts(events_fts) VALUES ('rebuild')"))
+            search_backend = "fts5"
+        except OperationalError:
+            search_backend = None  # SQLite built without FTS5
+    elif bind.dialect.name == "postgresql":
+        with bind.begin() as conn:
+            for statement in POSTGRES_DDL:
+                conn.execute(text(statement))
+        search_backend = "tsvector"
+
+def query_terms(q: str) -> List[str]:
+    """Split a search box query into word terms, each matched as a prefix"""
+    return re.findall(r"\w+", q)
+
+def search_venues(q: str, limit: int, offset: int, db: Session) -> List[Venue]:
+    terms = query_terms(q)
+    if search_backend and not terms:
+        return []
+
+    query = db.query(Venue)
+    if search_backend == "fts5":
+        query = (
+            query.join(venues_fts, venues_fts.c.rowid == Venue.id)
+            .filter(literal_column("venues_fts").op("MATCH")(" ".join(f'"{term}"*' for term in terms)))
+            .order_by(venues_fts.c.rank)
+        )
+    elif search_backend == "tsvector":
+        tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        vector = literal_column(VENUE_TSVECTOR)
+        query = query.filter(vector.op("@@")(tsquery)).order_by(func.ts_rank(vector, tsquery).desc())
+    else:
+        query = query.filter(Venue.name.ilike(f"%{q}%")).order_by(Venue.id)
+    return query.offset(offset).limit(limit).all()
+
+def search_events(q: str, limit: int, offset: int, db: Session) -> List[Event]:
+    terms = query_terms(q)
+    if search_backend and not terms:
+        return []
+
+    query = db.query(Event)
+    if search_backend == "fts5":
+        query = (
+            query.join(events_fts, events_fts.c.rowid == Event.id)
+            .filter(literal_column("events_fts").op("MATCH")(" ".join(f'"{term}"*' for term in terms)))
+            .order_by(events_fts.c.rank)
+        )
+    elif search_backend == "tsvector":
+        tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        vector = literal_column(EVENT_TSVECTOR)
+        query = query.filter(vector.op("@@")(tsquery)).order_by(func.ts_rank(vector, tsquery).desc())
+    else:
+        query = query.filter(
+            or_(Event.event_id.ilike(f"%{q}%"), Event.name.ilike(f"%{q}%"))
+        ).order_by(Event.id)
+    return query.offset(offset).limit(limit).all()
\ No newline at end of file
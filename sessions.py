@@ -0,0 +1,224 @@
+import base64
+import calendar
+import hashlib
+import heapq
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import Column, String, Text, DateTime, select, delete
+from database import Base, engine, SessionLocal, insert_ignore
+
+# Login sessions, keyed by session token. The memory store is private to one process;
+# with SESSION_STORE=database sessions live in the application database, where every
+# uvicorn worker sees them. SESSION_STORE=signed keeps no sessions at all: the token
+# carries the session, signed with SESSION_SECRET. Session data must be JSON serialisable
+SESSION_LIFETIME = timedelta(days=7)
+
+class SessionStore(ABC):
+    """Where sessions live; expired sessions are never returned"""
+
+    @abstractmethod
+    def create(self, data: dict, expires_at: datetime) -> str:
+        """Start a session and return its token"""
+
+    @abstractmethod
+    def get(self, token: str) -> Optional[dict]:
+        """The session's data plus its expires_at, or None if it doesn't exist or expired"""
+
+    @abstractmethod
+    def delete(self, token: str) -> bool:
+        """Remove a session; False if there was none"""
+
+class StatefulSessionStore(SessionStore):
+    """A store that keeps each session under a random token"""
+
+    def create(self, data: dict, expires_at: datetime) -> str:
+        token = secrets.token_urlsafe(32)
+        self.set(token, data, expires_at)
+        return token
+
+    @abstractmethod
+    def set(self, token: str, data: dict, expires_at: datetime):
+        """Store a session under token, replacing any session already there"""
+
+class MemorySessionStore(StatefulSessionStore):
+    """
+    Sessions in a dict, with a heap of expiry times so each write sweeps expired
+    sessions in O(log n) apiece. Past max_sessions the ones closest to expiring go first
+    """
+
+    def __init__(self, max_sessions: int = 100_000):
+        self.max_sessions = max_sessions
+        self._sessions = {}
+        self._expiry = []  # (expires_at, token); entries of replaced or deleted sessions are skipped
+        self._lock = threading.Lock()
+
+    def set(self, token: str, data: dict, expires_at: datetime):
+        with self._lock:
+            self._sessions[token] = (expires_at, data)
+            heapq.heappush(self._expiry, (expires_at, token))
+            self._evict(datetime.utcnow())
+
+    def get(self, token: str) -> Optional[dict]:
+        entry = self._sessions.get(token)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at <= datetime.utcnow():
+            return None  # Swept by a later write
+        return {**data, "expires_at": expires_at}
+
+    def delete(self, token: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(token, None) is not None
+
+    def _evict(self, now: datetime):
+        while self._expiry and (self._expiry[0][0] <= now or len(self._sessions) > self.max_sessions):
+            expires_at, token = heapq.heappop(self._expiry)
+            entry = self._sessions.get(token)
+            if entry is not None and entry[0] == expires_at:
+                del self._sessions[token]
+
+        # Logouts leave their heap entries behind; rebuild once they outnumber live sessions
+        if len(self._expiry) > 2 * len(self._sessions) + 1024:
+            self._expiry = [(expires_at, token) for token, (expires_at, _) in self._sessions.items()]
+            heapq.heapify(self._expiry)
+
+class SessionRecord(Base):
+    __tablename__ = "sessions"
+
+    token = Column(String, primary_key=True)
+    data = Column(Text, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class DatabaseSessionStore(StatefulSessionStore):
+    """Sessions in the sessions table, read by primary key; writes sweep expired rows every sweep_interval seconds"""
+
+    def __init__(self, sweep_interval: float = 300.0):
+        SessionRecord.__table__.create(bind=engine, checkfirst=True)
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+
+    def set(self, token: str, data: dict, expires_at: datetime):
+        with SessionLocal() as db:
+            db.merge(SessionRecord(token=token, data=json.dumps(data), expires_at=expires_at))
+            if time.monotonic() - self._last_sweep > self.sweep_interval:
+                self._last_sweep = time.monotonic()
+                db.execute(delete(SessionRecord).where(SessionRecord.expires_at <= datetime.utcnow()))
+            db.commit()
+
+    def get(self, token: str) -> Optional[dict]:
+        with SessionLocal() as db:
+            record = db.get(SessionRecord, token)
+            if record is None or record.expires_at <= datetime.utcnow():
+                return None
+            return {**json.loads(record.data), "expires_at": record.expires_at}
+
+    def delete(self, token: str) -> bool:
+        with SessionLocal() as db:
+            deleted = db.execute(delete(SessionRecord).where(SessionRecord.token == token)).rowcount
+            db.commit()
+            return deleted > 0
+
+class RevokedSession(Base):
+    __tablename__ = "revoked_sessions"
+
+    session_id = Column(String, primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+class SignedSessionStore(SessionStore):
+    """
+    Tokens carrying the session data and expiry, HMAC-SHA256 signed, so checking one
+    needs no lookup and any worker or node with the secret can do it. Logging out
+    adds the token's id to the revoked_sessions table until it would have expired;
+    each process reloads that list at most every refresh_interval seconds, which
+    bounds how long a token stays usable elsewhere after logout
+    """
+
+    def __init__(self, secret: str, refresh_interval: float = 30.0):
+        RevokedSession.__table__.create(bind=engine, checkfirst=True)
+        self._secret = secret.encode("utf-8")
+        self.refresh_interval = refresh_interval
+        self._revoked = set()
+        self._loaded_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def create(self, data: dict, expires_at: datetime) -> str:
+        payload = {**data, "sid": secrets.token_urlsafe(12), "exp": calendar.timegm(expires_at.utctimetuple())}
+        body = _b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        return f"{body}.{self._sign(body)}"
+
+    def get(self, token: str) -> Optional[dict]:
+        payload = self._verify(token)
+        if payload is None or payload["sid"] in self._revoked_ids():
+            return None
+        data = {key: value for key, value in payload.items() if key not in ("sid", "exp")}
+        return {**data, "expires_at": datetime.utcfromtimestamp(payload["exp"])}
+
+    def delete(self, token: str) -> bool:
+        payload = self._verify(token)
+        if payload is None or payload["sid"] in self._revoked_ids():
+            return False
+        with SessionLocal() as db:
+            db.execute(delete(RevokedSession).where(RevokedSession.expires_at <= datetime.utcnow()))
+            db.execute(insert_ignore(db, RevokedSession).values(
+                session_id=payload["sid"], expires_at=datetime.utcfromtimestamp(payload["exp"])
+            ))
+            db.commit()
+        with self._lock:
+            self._revoked.add(payload["sid"])
+        return True
+
+    def _sign(self, body: str) -> str:
+        return _b64encode(hmac.new(self._secret, body.encode("utf-8"), hashlib.sha256).digest())
+
+    def _verify(self, token: str) -> Optional[dict]:
+        """The token's payload if the signature matches and it hasn't expired"""
+        body, _, signature = token.partition(".")
+        if not hmac.compare_digest(self._sign(body).encode("ascii"), signature.encode("utf-8")):
+            return None
+        try:
+            payload = json.loads(_b64decode(body))
+        except ValueError:
+            return None
+        if payload["exp"] <= time.time():
+            return None
+        return payload
+
+    def _revoked_ids(self) -> set:
+        if time.monotonic() - self._loaded_at > self.refresh_interval:
+            with SessionLocal() as db:
+                revoked = set(db.scalars(
+                    select(RevokedSession.session_id).where(RevokedSession.expires_at > datetime.utcnow())
+                ))
+            with self._lock:
+                self._revoked = revoked
+                self._loaded_at = time.monotonic()
+        return self._revoked
+
+def make_session_store() -> SessionStore:
+    kind = os.getenv("SESSION_STORE", "memory").lower()
+    if kind == "database":
+        return DatabaseSessionStore()
+    if kind == "signed":
+        secret = os.getenv("SESSION_SECRET")
+        if not secret:
+            raise ValueError("SESSION_STORE=signed needs SESSION_SECRET, shared by every worker")
+        return SignedSessionStore(secret)
+    if kind != "memory":
+        raise ValueError("SESSION_STORE must be 'memory', 'database' or 'signed'")
+    return MemorySessionStore(int(os.getenv("SESSION_STORE_SIZE", "100000")))
+
+session_store = make_session_store()
\ No newline at end of file
@@ -8,9 +8,9 @@ from pydantic import BaseModel
 from database import engine, get_db, Base
 from models import Venue, Event
 from auth import get_api_key
+from sessions import session_store, SESSION_LIFETIME
 from url_parser import extract_event_id_from_url, detect_base_url_pattern, parse_bulk_input
-import secrets
-from datetime import datetime, timedelta
+from datetime import datetime
 
 # Create tables (but not user table)
 Base.metadata.create_all(bind=engine)
@@ -55,9 +55,6 @@ HARDCODED_USERS = {
     }
 }
 
-# Session storage
-active_sessions = {}
-
 class UserLogin(BaseModel):
     username: str
     password: str
@@ -74,9 +71,6 @@ class LoginResponse(BaseModel):
     session_token: str
     message: str
 
-def create_session_token() -> str:
-    return secrets.token_urlsafe(32)
-
 @app.post("/auth/login", response_model=LoginResponse)
 def login_user(user_data: UserLogin):
     """Login user with hardcoded credentials"""
@@ -97,13 +91,11 @@ def login_user(user_data: UserLogin):
         )
     
     # Create session
-    session_token = create_session_token()
-    active_sessions[session_token] = {
+    session_token = session_store.create({
         "user_id": user["id"],
         "username": user["username"],
-        "created_at": datetime.utcnow(),
-        "expires_at": datetime.utcnow() + timedelta(days=7)
-    }
+        "created_at": datetime.utcnow().isoformat()
+    }, datetime.utcnow() + SESSION_LIFETIME)
     
     # Create user response object
     user_response = UserResponse(
@@ -123,8 +115,7 @@ def login_user(user_data: UserLogin):
 @app.post("/auth/logout")
 def logout_user(session_token: str):
     """Logout user and invalidate session"""
-    if session_token in active_sessions:
-        del active_sessions[session_token]
+    if session_store.delete(session_token):
         return {"message": "Logout successful"}
     else:
         raise HTTPException(
@@ -135,7 +126,8 @@ def logout_user(session_token: str):
 @app.get("/auth/verify-session")
 def verify_session(session_token: str):
     """Verify if session is valid and return user info"""
-    session_data = active_sessions.get(session_token)
+    # Expired sessions are never returned by the store
+    session_data = session_store.get(session_token)
     
     if not session_data:
         raise HTTPException(
@@ -143,19 +135,11 @@ def verify_session(session_token: str):
             detail="Invalid or expired session"
         )
     
-    # Check if session is expired
-    if datetime.utcnow() > session_data["expires_at"]:
-        del active_sessions[session_token]
-        raise HTTPException(
-            status_code=401,
-            detail="Session expired"
-        )
-    
     # Get hardcoded user data
     username = session_data["username"]
     user = HARDCODED_USERS.get(username)
     if not user or not user["is_active"]:
-        del active_sessions[session_token]
+        session_store.delete(session_token)
         raise HTTPException(
             status_code=401,
             detail="User account not found or disabled"
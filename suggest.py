@@ -0,0 +1,225 @@
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from math import ceil
+from typing import List, Optional, Tuple
+from models import Venue, Event
+
+VENUE = 0
+EVENT = 1
+KINDS = ("venue", "event")
+
+MIN_SIMILARITY = 0.5  # Share of the query's trigrams a suggestion must contain
+MAX_SCANNED = 5000  # Postings of the rarest trigrams counted per keystroke
+MAX_CANDIDATES = 200  # Documents with the most of those hits that get fully scored
+
+_WORD = re.compile(r"\w+")
+
+def trigrams(text: str, prefix: bool = False) -> set:
+    """
+    Trigrams of each lowercased word, padded like pg_trgm ("  w", " wo", ..., "rd ")
+    With prefix=True the last word is treated as still being typed and gets no end padding
+    """
+    words = _WORD.findall(text.lower())
+    grams = set()
+    for position, word in enumerate(words):
+        padded = "  " + word
+        if not (prefix and position == len(words) - 1):
+            padded += " "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def event_text(external_id: Optional[str], name: Optional[str]) -> str:
+    """The indexed text of an event"""
+    # Bulk-created events are often named after their ID; index that text once
+    parts = [external_id] if name == external_id else [external_id, name]
+    return " ".join(part for part in parts if part)
+
+class TrigramIndex:
+    """
+    In-process trigram index over venue names and event IDs/names for search-as-you-type.
+
+    Every indexed document gets a slot number; postings are sorted array('I') slot lists
+    per trigram, and ids/kinds/trigram counts are arrays by slot, so memory stays a few
+    bytes per posting. Removing a document only blanks its slot; the postings are compacted once
+    removed slots outnumber live ones. Each worker process keeps its own index:
+    suggest_current() drops and repairs rows deleted or renamed through another
+    worker, while rows added there show up after this worker's restart.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._postings = {}
+        self._kinds = array("B")
+        self._ids = array("I")
+        self._sizes = array("H")
+        self._texts = []
+        # Slot of each venue/event id, -1 when not indexed; ids are dense so arrays beat dicts
+        self._slot_by_id = (array("i"), array("i"))
+        self._removed = 0
+
+    def __len__(self) -> int:
+        return len(self._texts) - self._removed
+
+    def add(self, kind: int, doc_id: int, text: Optional[str]):
+        """Index a document, replacing any earlier text for the same kind and id"""
+        with self._lock:
+            self._remove(kind, doc_id)
+            if text:
+                self._add(kind, doc_id, text)
+
+    def remove(self, kind: int, doc_id: int):
+        with self._lock:
+            self._remove(kind, doc_id)
+
+    def add_venue(self, venue_id: int, name: Optional[str]):
+        self.add(VENUE, venue_id, name)
+
+    def add_event(self, event_id: int, external_id: Optional[str], name: Optional[str]):
+        self.add(EVENT, event_id, event_text(external_id, name))
+
+    def suggest(self, q: str, limit: int = 10) -> List[Tuple[str, int, str]]:
+        """
+        Best fuzzy matches for q as (kind, id, text): texts containing q first, then by
+        trigram similarity (shared / all trigrams of q and the text), then shortest
+        """
+        query_grams = trigrams(q, prefix=True)
+        if not query_grams:
+            return []
+        query = " ".join(_WORD.findall(q.lower()))
+
+        with self._lock:
+            needed = max(1, ceil(MIN_SIMILARITY * len(query_grams)))
+            lists = sorted(filter(None, map(self._postings.get, query_grams)), key=len)
+            if len(lists) < needed:
+                return []
+            # A match must appear in at least one of the rarest len - needed + 1 lists.
+            # Count hits across as many of them as MAX_SCANNED allows in one pass, then
+            # probe the rest only for the documents most similar so far
+            rare = lists[:len(lists) - needed + 1]
+            scanned = 1
+            budget = MAX_SCANNED - len(rare[0])
+            while scanned < len(rare) and len(rare[scanned]) <= budget:
+                budget -= len(rare[scanned])
+                scanned += 1
+            if scanned == 1:
+                # One list tells its documents apart by nothing but length; count all the
+                # rare lists instead over the slot range that holds about MAX_SCANNED postings
+                total = sum(map(len, rare))
+                end = rare[0][max(1, min(len(rare[0]), len(rare[0]) * MAX_SCANNED // total)) - 1]
+                scanned = len(rare)
+                rare = [postings[:bisect_right(postings, end)] for postings in rare]
+            hits = Counter()
+            for postings in rare[:scanned]:
+                hits.update(postings)
+            # Most hits first, and the shortest, so most similar, among equal hits
+            candidates = sorted(hits, key=self._sizes.__getitem__)
+            candidates.sort(key=hits.__getitem__, reverse=True)
+            candidates = sorted(candidates[:MAX_CANDIDATES])
+            candidate_set = set(candidates)
+            for postings in lists[scanned:]:
+                if len(postings) <= 32 * len(candidates):
+                    # Hashing every posting beats a search per candidate on shorter lists
+                    hits.update(candidate_set.intersection(postings))
+                    continue
+                # Candidates are sorted, so each search resumes where the last one ended
+                position = 0
+                for slot in candidates:
+                    position = bisect_left(postings, slot, position)
+                    if position == len(postings):
+                        break
+                    if postings[position] == slot:
+                        hits[slot] += 1
+
+            scored = []
+            for slot in candidates:
+                text = self._texts[slot]
+                count = hits[slot]
+                if text is None or count < needed:
+                    continue
+                similarity = count / (len(query_grams) + self._sizes[slot] - count)
+                scored.append((query not in text.lower(), -similarity, len(text), slot))
+
+            scored.sort()
+            return [
+                (KINDS[self._kinds[slot]], self._ids[slot], self._texts[slot])
+                for *_, slot in scored[:limit]
+            ]
+
+    def _add(self, kind: int, doc_id: int, text: str):
+        slot = len(self._texts)
+        self._kinds.append(kind)
+        self._ids.append(doc_id)
+        self._texts.append(text)
+        grams = trigrams(text)
+        self._sizes.append(min(len(grams), 0xFFFF))
+
+        slots = self._slot_by_id[kind]
+        if doc_id >= len(slots):
+            slots.extend([-1] * (doc_id + 1 - len(slots)))
+        slots[doc_id] = slot
+
+        # Slots only grow, so appending keeps every posting list sorted
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array("I")
+            postings.append(slot)
+
+    def _remove(self, kind: int, doc_id: int):
+        slots = self._slot_by_id[kind]
+        if doc_id < len(slots) and slots[doc_id] != -1:
+            self._texts[slots[doc_id]] = None
+            slots[doc_id] = -1
+            self._removed += 1
+            if self._removed > 1000 and self._removed > len(self._texts) - self._removed:
+                self._compact()
+
+    def _compact(self):
+        live = [
+            (self._kinds[slot], self._ids[slot], text)
+            for slot, text in enumerate(self._texts) if text is not None
+        ]
+        self._reset()
+        for kind, doc_id, text in live:
+            self._add(kind, doc_id, text)
+
+def build_index(db) -> TrigramIndex:
+    """Build the index from every venue and event in the database"""
+    index = TrigramIndex()
+    for venue_id, name in db.query(Venue.id, Venue.name).yield_per(10000):
+        index.add_venue(venue_id, name)
+    for event_id, external_id, name in db.query(Event.id, Event.event_id, Event.name).yield_per(10000):
+        index.add_event(event_id, external_id, name)
+    return index
+
+def suggest_current(index: TrigramIndex, q: str, limit: int, db) -> List[Tuple[str, int, str]]:
+    """
+    index.suggest() checked against the database by primary key: suggestions whose row
+    was deleted or renamed, for instance through another worker, are dropped and fixed
+    in this process's index, and the query is rerun until nothing stale comes back
+    """
+    for _ in range(3):
+        suggestions = index.suggest(q, limit)
+        current = {}
+        venue_ids = [doc_id for kind, doc_id, _ in suggestions if kind == KINDS[VENUE]]
+        if venue_ids:
+            for venue_id, name in db.query(Venue.id, Venue.name).filter(Venue.id.in_(venue_ids)):
+                current[KINDS[VENUE], venue_id] = name
+        event_ids = [doc_id for kind, doc_id, _ in suggestions if kind == KINDS[EVENT]]
+        if event_ids:
+            rows = db.query(Event.id, Event.event_id, Event.name).filter(Event.id.in_(event_ids))
+            for event_id, external_id, name in rows:
+                current[KINDS[EVENT], event_id] = event_text(external_id, name)
+
+        stale = [(kind, doc_id) for kind, doc_id, text in suggestions if current.get((kind, doc_id)) != text]
+        if not stale:
+            break
+        for kind, doc_id in stale:
+            index.add(KINDS.index(kind), doc_id, current.get((kind, doc_id)))
+    return [suggestion for suggestion in suggestions if current.get(suggestion[:2]) == suggestion[2]]
\ No newline at end of file
@@ -1,28 +1,54 @@
+import os
 import re
 from urllib.parse import urlparse
-from typing import Optional, List, Tuple
+from itertools import islice
+from typing import Optional, List, Tuple, Iterable, Iterator
+
+# Common patterns for event IDs in URLs, in priority order. The first kind that
+# occurs anywhere in the URL wins, so the group number doubles as the priority.
+_EVENT_ID = r'[a-zA-Z0-9\-_]+'
+_EVENT_ID_PATTERN = re.compile(
+    r'/(?:events?/(?P<events>{id})'
+    r'|event-(?P<event_prefix>{id})'
+    r'|e/(?P<e>{id})'
+    r'|tickets/(?P<tickets>{id})'
+    r'|ticket/(?P<ticket>{id})'
+    r'|show/(?P<show>{id}))'.format(id=_EVENT_ID)
+)
+_EVENT_ID_ONLY = re.compile(_EVENT_ID)
 
 def extract_event_id_from_url(url: str) -> Optional[str]:
     """Extract event ID from various URL patterns"""
     
-    # Common patterns for event IDs in URLs
-    patterns = [
-        r'/events?/([a-zA-Z0-9\-_]+)',
-        r'/event-([a-zA-Z0-9\-_]+)',
-        r'/e/([a-zA-Z0-9\-_]+)',
-        r'/tickets/([a-zA-Z0-9\-_]+)',
-        r'/ticket/([a-zA-Z0-9\-_]+)',
-        r'/show/([a-zA-Z0-9\-_]+)',
-        r'/([a-zA-Z0-9\-_]+)/?$',  # ID at the end of URL
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
+    # Walk the candidates left to right in one pass, keeping the highest priority
+    best = None
+    match = _EVENT_ID_PATTERN.search(url)
+    while match:
+        if best is None or match.lastindex < best.lastindex:
+            best = match
+            if best.lastindex == 1:
+                break
+        match = _EVENT_ID_PATTERN.search(url, match.start() + 1)
+    
+    if best:
+        return best.group(best.lastindex)
+    
+    # ID at the end of URL, same as r'/([a-zA-Z0-9\-_]+)/?$'
+    if url.endswith('\n'):
+        url = url[:-1]
+    if url.endswith('/'):
+        url = url[:-1]
+    _, slash, last_segment = url.rpartition('/')
+    if slash and _EVENT_ID_ONLY.fullmatch(last_segment):
+        return last_segment
     
     return None
 
+def extract_event_ids(urls: Iterable[str]) -> List[Optional[str]]:
+    """Extract event IDs for many URLs at once, in the same order"""
+    extract = extract_event_id_from_url
+    return [extract(url) for url in urls]
+
 def detect_base_url_pattern(urls: List[str]) -> Optional[str]:
     """Detect base URL pattern from multiple event URLs"""
     
@@ -37,20 +63,31 @@ def detect_base_url_pattern(urls: List[str]) -> Optional[str]:
         return None
         
     domain = domains.pop()
-    paths = [parsed.path for parsed in parsed_urls]
     
     # Find common path prefix
-    if not paths:
-        return f"https://{domain}"
-        
-    common_prefix = paths[0]
-    for path in paths[1:]:
-        while common_prefix and not path.startswith(common_prefix):
-            common_prefix = common_prefix[:-1]
+    common_prefix = _common_path_prefix([parsed.path for parsed in parsed_urls])
+    
+    return _base_url_from_prefix(domain, common_prefix)
+
+def _common_path_prefix(paths: List[str]) -> str:
+    """
+    Common prefix of paths, cut back to whole path segments.
+    Keeps the trailing '/' when every path continues past the shared segments.
+    """
+    # Whatever the smallest and largest path share, every path in between shares too
+    prefix = os.path.commonprefix([min(paths), max(paths)])
+    
+    # Drop a partial trailing segment unless the prefix ends on a boundary in every path
+    end = len(prefix)
+    if not prefix.endswith('/') and any(path[end:end + 1] not in ('', '/') for path in paths):
+        prefix = prefix[:prefix.rfind('/') + 1]
+    return prefix
+
+def _base_url_from_prefix(domain: str, common_prefix: str) -> str:
+    """Build the base URL from a domain and the common path prefix of its event URLs"""
     
     # Remove trailing characters to find pattern
-    while common_prefix and common_prefix[-1] in '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ-_':
-        common_prefix = common_prefix[:-1]
+    common_prefix = common_prefix.rstrip('0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ-_')
     
     # Construct base URL pattern
     base_url = f"https://{domain}{common_prefix}"
@@ -59,6 +96,41 @@ def detect_base_url_pattern(urls: List[str]) -> Optional[str]:
         
     return base_url
 
+class BaseUrlPattern:
+    """
+    Running state of detect_base_url_pattern for one venue, so new event URLs
+    can be folded in one at a time in O(len(url)) instead of re-scanning every URL
+    """
+    
+    def __init__(self, count: int = 0, domain: Optional[str] = None,
+                 path_prefix: Optional[str] = None, mixed_domains: bool = False):
+        self.count = count
+        self.domain = domain
+        self.path_prefix = path_prefix
+        self.mixed_domains = mixed_domains
+    
+    def add(self, url: str) -> None:
+        """Fold a new event URL into the pattern"""
+        parsed = urlparse(url)
+        self.count += 1
+        
+        if self.count == 1:
+            self.domain = parsed.netloc
+            self.path_prefix = parsed.path
+            return
+        
+        if parsed.netloc != self.domain:
+            self.mixed_domains = True
+        self.path_prefix = _common_path_prefix([self.path_prefix, parsed.path])
+    
+    @property
+    def base_url(self) -> Optional[str]:
+        """Same result detect_base_url_pattern would give for all URLs added so far"""
+        if self.count < 2 or self.mixed_domains:
+            return None
+        
+        return _base_url_from_prefix(self.domain, self.path_prefix)
+
 def build_event_url(base_url: str, event_id: str) -> str:
     """Build full event URL from base URL and event ID"""
     
@@ -73,26 +145,50 @@ def build_event_url(base_url: str, event_id: str) -> str:
     else:
         return f"{base_url}/{event_id}"
 
+def iter_lines(text: str) -> Iterator[str]:
+    """Yield the lines of text one at a time without splitting it into a list"""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+def iter_bulk_input(lines: Iterable[str], base_url: Optional[str] = None,
+                    chunk_size: int = 1000) -> Iterator[Tuple[str, str]]:
+    """
+    Lazily parse bulk input of either URLs or event IDs from any iterable of
+    lines (a list, a file object, a request stream)
+    Yields (url, event_id) tuples, holding at most chunk_size lines at a time
+    """
+    
+    stripped = (line.strip() for line in lines)
+    non_empty = (line for line in stripped if line)
+    
+    while True:
+        lines_chunk = list(islice(non_empty, chunk_size))
+        if not lines_chunk:
+            return
+        
+        # Extract IDs for all full URLs in the chunk in one batch
+        event_ids = iter(extract_event_ids(line for line in lines_chunk if line.startswith('http')))
+        
+        for line in lines_chunk:
+            if line.startswith('http'):
+                # It's a full URL
+                yield line, next(event_ids)
+            elif base_url:
+                # It's just an event ID, build the full URL
+                yield build_event_url(base_url, line), line
+            else:
+                # Just an ID but no base URL
+                yield line, line
+
 def parse_bulk_input(input_text: str, base_url: Optional[str] = None) -> List[Tuple[str, str]]:
     """
     Parse bulk input of either URLs or event IDs
     Returns list of (url, event_id) tuples
     """
-    
-    lines = [line.strip() for line in input_text.split('\n') if line.strip()]
-    results = []
-    
-    for line in lines:
-        if line.startswith('http'):
-            # It's a full URL
-            event_id = extract_event_id_from_url(line)
-            results.append((line, event_id))
-        elif base_url:
-            # It's just an event ID, build the full URL
-            full_url = build_event_url(base_url, line)
-            results.append((full_url, line))
-        else:
-            # Just an ID but no base URL
-            results.append((line, line))
-    
-    return results
\ No newline at end of file
+    return list(iter_bulk_input(iter_lines(input_text), base_url))
\ No newline at end of file
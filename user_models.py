@@ -1,8 +1,7 @@
 from sqlalchemy import Column, Integer, String, DateTime, Boolean
 from sqlalchemy.sql import func
 from database import Base
-import hashlib
-import secrets
+import passwords
 
 class User(Base):
     __tablename__ = "users"
@@ -17,16 +16,9 @@ class User(Base):
     @staticmethod
     def hash_password(password: str) -> str:
         """Hash a password with salt"""
-        salt = secrets.token_hex(32)
-        password_hash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), 100000)
-        return f"{salt}${password_hash.hex()}"
+        return passwords.hash_password(password)
     
     @staticmethod
     def verify_password(password: str, hashed_password: str) -> bool:
         """Verify a password against its hash"""
-        try:
-            salt, stored_hash = hashed_password.split('$')
-            password_hash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), 100000)
-            return password_hash.hex() == stored_hash
-        except:
-            return False
\ No newline at end of file
+        return passwords.verify_password(password, hashed_password)
\ No newline at end of file